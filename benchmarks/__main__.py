@@ -0,0 +1,244 @@
+"""
+Headless benchmarks for the locks, buffers and file writer.
+
+    python -m benchmarks prodcons --engine dekker mutex ring --buffer-size 16 256
+    python -m benchmarks prodcons --engine mutex --overflow block reject drop_oldest
+    python -m benchmarks lock --lock dekker bakery filter tournament --threads 2 4
+    python -m benchmarks filewriter --threads 1 2 4
+    python -m benchmarks actors --model threads asyncio --actors 1000 4000
+    python -m benchmarks stress --threads 2 4 8        # exit 1 on any lost item or overlap
+    python -m benchmarks compare gil.json nogil.json   # two `lock` reports side by side
+    python -m benchmarks all --output results.json
+
+Every run prints one summary line per case and writes all results as JSON
+(to --output, or stdout with --output -) so runs can be diffed between commits.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from utils.buffer import OVERFLOW_POLICIES
+from benchmarks.stress import compare, stress_buffer, stress_lock
+from synchronization.fences import FENCES
+from benchmarks.workloads import ACTOR_MODELS, bench_actors, bench_filewriter, bench_lock, bench_prodcons
+from utils.engines import ENGINES, LOCKS
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _environment() -> dict:
+    gil = getattr(sys, "_is_gil_enabled", None)
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "gil_enabled": gil() if gil else True,
+        "fences": FENCES,
+        "cpus": os.cpu_count(),
+        "platform": platform.platform(),
+    }
+
+
+def _cases_prodcons(args):
+    for engine in args.engine:
+        for size in args.buffer_size:
+            for producers in args.producers:
+                for consumers in args.consumers:
+                    for overflow in args.overflow:
+                        yield lambda e=engine, s=size, p=producers, c=consumers, o=overflow: bench_prodcons(
+                            e, s, args.items, p, c, args.batch, args.lock_stats, o)
+
+
+def _cases_lock(args):
+    for lock in args.lock:
+        for threads in args.threads:
+            yield lambda lk=lock, t=threads: bench_lock(lk, t, args.iterations, args.lock_stats)
+
+
+def _cases_filewriter(args):
+    path = args.path or os.path.join(tempfile.gettempdir(), "os-lw-bench.txt")
+    for threads in args.threads:
+        yield lambda t=threads: bench_filewriter(path, t, args.lines, args.flush_bytes, args.lock_stats)
+
+
+def _cases_actors(args):
+    for model in args.model:
+        for actors in args.actors:
+            yield lambda m=model, a=actors: bench_actors(m, a, args.items, args.buffer_size[0])
+
+
+def _cases_stress(args):
+    for lock in args.lock:
+        for threads in args.threads:
+            yield lambda lk=lock, t=threads: stress_lock(lk, t, args.iterations)
+    seen = set()
+    for engine in args.engine:
+        for threads in args.threads:
+            # the ring is SPSC; everything else gets the threads split between both sides
+            producers = 1 if engine == "ring" else max(1, threads // 2)
+            consumers = 1 if engine == "ring" else max(1, threads - producers)
+            if (engine, producers, consumers) in seen:
+                continue
+            seen.add((engine, producers, consumers))
+            yield lambda e=engine, p=producers, c=consumers: stress_buffer(e, p, c, args.items,
+                                                                          batch=args.batch)
+
+
+def _stress_summary(result: dict) -> str:
+    label = result.get("lock") or result.get("engine")
+    threads = result.get("threads") or result["producers"] + result["consumers"]
+    detail = (f"violations={result['violations']} lost_updates={result['lost_updates']}"
+              if "violations" in result else f"lost={result['lost']} duplicated={result['duplicated']}")
+    return (f"{result['workload']:<14} {label:<10} threads={threads:<3} {detail} "
+            f"{'ok' if result['ok'] else 'FAILED'} ({result['wall_s']:.2f}s)")
+
+
+def _summary(result: dict) -> str:
+    latency = next(v for k, v in result.items() if k.endswith("_latency"))
+    label = result.get("engine") or result.get("lock") or "appender"
+    threads = result.get("threads") or result.get("actors") or result["producers"] + result["consumers"]
+    return (f"{result['workload']:<10} {label:<10} threads={threads:<3} "
+            f"{result['ops_per_s']:>12.0f} ops/s  p50={latency['p50_us']:.1f}us "
+            f"p99={latency['p99_us']:.1f}us p999={latency['p999_us']:.1f}us cpu={result['cpu_s']:.2f}s")
+
+
+def _add_prodcons_args(p):
+    p.add_argument("--engine", nargs="+", default=["dekker", "mutex", "ring"], choices=sorted(ENGINES))
+    p.add_argument("--buffer-size", nargs="+", type=int, default=[100])
+    p.add_argument("--items", type=int, default=20000)
+    p.add_argument("--producers", nargs="+", type=int, default=[1])
+    p.add_argument("--consumers", nargs="+", type=int, default=[1])
+    p.add_argument("--batch", type=int, default=1)
+    p.add_argument("--overflow", nargs="+", default=["block"], choices=OVERFLOW_POLICIES,
+                   help="full-buffer policy (not for the ring engine)")
+
+
+def _add_lock_args(p):
+    p.add_argument("--lock", nargs="+", default=sorted(LOCKS), choices=sorted(LOCKS))
+    p.add_argument("--iterations", type=int, default=5000)
+
+
+def _add_filewriter_args(p):
+    p.add_argument("--lines", type=int, default=20000)
+    p.add_argument("--flush-bytes", type=int, default=4096)
+    p.add_argument("--path", default=None, help="output file (default: temp dir)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="workload", required=True)
+
+    p = sub.add_parser("prodcons", help="producer/consumer through a buffer engine")
+    _add_prodcons_args(p)
+    p = sub.add_parser("lock", help="raw lock acquire/release")
+    _add_lock_args(p)
+    p.add_argument("--threads", nargs="+", type=int, default=[2])
+    p = sub.add_parser("filewriter", help="threads appending lines under SharedMutex")
+    _add_filewriter_args(p)
+    p.add_argument("--threads", nargs="+", type=int, default=[2])
+    p = sub.add_parser("actors", help="thread vs coroutine actors at high counts")
+    p.add_argument("--model", nargs="+", default=list(ACTOR_MODELS), choices=ACTOR_MODELS)
+    p.add_argument("--actors", nargs="+", type=int, default=[1000],
+                   help="producers per case (the same number of consumers is added)")
+    p.add_argument("--items", type=int, default=20000)
+    p.add_argument("--buffer-size", nargs="+", type=int, default=[100])
+    p = sub.add_parser("stress", help="mutual-exclusion and lost-item checks (exit 1 on failure)")
+    p.add_argument("--lock", nargs="+", default=sorted(LOCKS), choices=sorted(LOCKS))
+    p.add_argument("--engine", nargs="+", default=sorted(ENGINES), choices=sorted(ENGINES))
+    p.add_argument("--threads", nargs="+", type=int, default=[2, 4])
+    p.add_argument("--iterations", type=int, default=20000)
+    p.add_argument("--items", type=int, default=50000)
+    p.add_argument("--batch", type=int, default=1)
+    p = sub.add_parser("compare", help="pair the lock results of two reports (e.g. GIL vs free-threaded)")
+    p.add_argument("baseline", help="JSON report of the reference interpreter")
+    p.add_argument("other", help="JSON report to compare against it")
+    p = sub.add_parser("all", help="default cases of every workload")
+    _add_prodcons_args(p)
+    _add_lock_args(p)
+    _add_filewriter_args(p)
+    p.add_argument("--threads", nargs="+", type=int, default=[2])
+
+    for p in sub.choices.values():
+        p.add_argument("--output", "-o", default="-", help="JSON results file, '-' for stdout")
+        p.add_argument("--lock-stats", action="store_true",
+                       help="enable lock instrumentation and include its snapshot")
+    return parser
+
+
+def _write(args, payload: dict):
+    report = json.dumps(payload, indent=2)
+    if args.output == "-":
+        print(report)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+
+
+def _main_compare(args) -> int:
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.other, encoding="utf-8") as f:
+        other = json.load(f)
+    rows = compare(baseline, other)
+    for r in rows:
+        print(f"{r['lock']:<10} threads={r['threads']:<3} {r['baseline_ops_per_s']:>12.0f} -> "
+              f"{r['other_ops_per_s']:>12.0f} ops/s  x{r['ratio'] or 0:.2f}", file=sys.stderr)
+    _write(args, {"baseline": baseline["environment"], "other": other["environment"], "rows": rows})
+    return 0
+
+
+def _main_stress(args) -> int:
+    results = []
+    for case in _cases_stress(args):
+        try:
+            result = case()
+        except ValueError as e:  # combination the lock/engine does not support
+            print(f"skipped: {e}", file=sys.stderr)
+            continue
+        results.append(result)
+        print(_stress_summary(result), file=sys.stderr)
+    _write(args, {"environment": _environment(), "results": results})
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.workload == "compare":
+        return _main_compare(args)
+    if args.workload == "stress":
+        return _main_stress(args)
+    if args.workload == "all":
+        cases = [*_cases_prodcons(args), *_cases_lock(args), *_cases_filewriter(args)]
+    else:
+        cases = list({"prodcons": _cases_prodcons, "lock": _cases_lock, "filewriter": _cases_filewriter,
+                      "actors": _cases_actors}[args.workload](args))
+
+    results = []
+    for case in cases:
+        try:
+            result = case()
+        except ValueError as e:  # combination the engine does not support
+            print(f"skipped: {e}", file=sys.stderr)
+            continue
+        results.append(result)
+        print(_summary(result), file=sys.stderr)
+
+    _write(args, {"environment": _environment(), "results": results})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
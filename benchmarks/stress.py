@@ -0,0 +1,156 @@
+"""
+Correctness stress tests for the locks and buffer engines. Meant to be run
+on the free-threaded build (python3.14t), where the software locks rely on
+synchronization.fences; OS_LW_FENCES=0 shows what happens without them.
+The fences are store-load barriers on x86-64 only: a pass there says nothing
+about weakly ordered CPUs (aarch64), which need a run of their own.
+"""
+import threading
+import time
+from typing import List
+from utils.engines import ENGINES, LOCKS
+
+
+def stress_lock(lock: str, threads: int, iterations: int, yield_every: int = 64) -> dict:
+    """
+    Threads enter the critical section `iterations` times each. Inside, a
+    thread checks that no one else is there (owner slot) and does a split
+    read-modify-write of a counter, yielding in the middle every
+    `yield_every` entries to widen the race window. Any overlap shows up as
+    `violations` and/or `lost_updates`.
+    """
+    lk = LOCKS[lock](threads)
+    if getattr(lk, "parties", None) is not None and lk.parties < threads:
+        raise ValueError(f"{lock} supports {lk.parties} threads")
+    owner: List = [None]
+    counter = [0]
+    violations = [0] * threads
+    start = threading.Barrier(threads)
+
+    def worker(pid: int):
+        start.wait()
+        for k in range(iterations):
+            lk.acquire(pid)
+            if owner[0] is not None:
+                violations[pid] += 1
+            owner[0] = pid
+            value = counter[0]
+            if yield_every and k % yield_every == 0:
+                time.sleep(0)
+            counter[0] = value + 1
+            if owner[0] != pid:
+                violations[pid] += 1
+            owner[0] = None
+            lk.release(pid)
+
+    ts = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(threads)]
+    t0 = time.perf_counter()
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    expected = threads * iterations
+    return {
+        "workload": "stress-lock",
+        "lock": lock,
+        "threads": threads,
+        "iterations": iterations,
+        "wall_s": time.perf_counter() - t0,
+        "violations": sum(violations),
+        "lost_updates": expected - counter[0],
+        "ok": sum(violations) == 0 and counter[0] == expected,
+    }
+
+
+def stress_buffer(engine: str, producers: int, consumers: int, items: int, buffer_size: int = 16,
+                  batch: int = 1) -> dict:
+    """
+    Producers put unique ints through a small buffer, consumers take them
+    out; every item must arrive exactly once (no `lost`, no `duplicated`).
+    """
+    if engine == "ring" and (producers, consumers) != (1, 1):
+        raise ValueError("the ring engine is single-producer single-consumer")
+    buffer = ENGINES[engine](buffer_size, producers + consumers)
+    if getattr(buffer, "parties", None) is not None and buffer.parties < producers + consumers:
+        raise ValueError(f"{engine} supports {buffer.parties} threads")
+    received: List[List[int]] = [[] for _ in range(consumers)]
+    per_producer = items // producers
+    expected = per_producer * producers
+    remaining = [producers]
+    remaining_lock = threading.Lock()
+    done = threading.Event()
+
+    def producer(p: int):
+        try:
+            buffer.register()
+            base = p * per_producer
+            for k in range(0, per_producer, batch):
+                chunk = list(range(base + k, base + min(k + batch, per_producer)))
+                stored = 0
+                while stored < len(chunk):
+                    stored += buffer.put_many(chunk[stored:], timeout=0.5)
+        finally:
+            buffer.unregister()
+            with remaining_lock:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    done.set()
+
+    def consumer(out: List[int]):
+        try:
+            buffer.register()
+            while True:
+                got = buffer.get_many(batch, block=True, timeout=0.01)
+                if got:
+                    out.extend(got)
+                elif done.is_set() and buffer.size() == 0:
+                    break
+        finally:
+            buffer.unregister()
+
+    ts = [threading.Thread(target=producer, args=(p,), daemon=True) for p in range(producers)]
+    ts += [threading.Thread(target=consumer, args=(out,), daemon=True) for out in received]
+    t0 = time.perf_counter()
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    got = [x for out in received for x in out]
+    distinct = set(got)
+    lost = expected - len(distinct & set(range(expected)))
+    return {
+        "workload": "stress-buffer",
+        "engine": engine,
+        "producers": producers,
+        "consumers": consumers,
+        "items": expected,
+        "batch": batch,
+        "wall_s": time.perf_counter() - t0,
+        "lost": lost,
+        "duplicated": len(got) - len(distinct),
+        "ok": lost == 0 and len(got) == len(distinct) == expected,
+    }
+
+
+def compare(baseline: dict, other: dict) -> List[dict]:
+    """
+    Pair the `lock` results of two benchmark reports (e.g. the default and the
+    free-threaded interpreter) by (lock, threads): ops/s of each, their ratio,
+    and each run's speedup over its own single-thread case.
+    """
+    def index(report):
+        return {(r["lock"], r["threads"]): r["ops_per_s"] for r in report["results"] if r["workload"] == "lock"}
+
+    a, b = index(baseline), index(other)
+    rows = []
+    for lock, threads in sorted(a.keys() & b.keys()):
+        rows.append({
+            "lock": lock,
+            "threads": threads,
+            "baseline_ops_per_s": a[(lock, threads)],
+            "other_ops_per_s": b[(lock, threads)],
+            "ratio": b[(lock, threads)] / a[(lock, threads)] if a[(lock, threads)] else None,
+            "baseline_scaling": a[(lock, threads)] / a[(lock, 1)] if a.get((lock, 1)) else None,
+            "other_scaling": b[(lock, threads)] / b[(lock, 1)] if b.get((lock, 1)) else None,
+        })
+    return rows
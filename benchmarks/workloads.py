@@ -0,0 +1,330 @@
+import asyncio
+import os
+import threading
+import time
+import tracemalloc
+from typing import Dict, List
+from synchronization.mutex_manager import SharedMutex
+from utils.buffer import BLOCK, ThreadSafeBuffer
+from utils.engines import ENGINES, LOCKS
+from utils.file_manager import FileAppender
+from utils.async_buffer import AsyncBuffer
+
+
+def _enable_stats(lock, enabled: bool):
+    if enabled and hasattr(lock, "set_stats_enabled"):
+        lock.set_stats_enabled(True)
+
+
+def _stats_of(lock) -> dict:
+    stats = getattr(lock, "stats", None)
+    return {"lock_stats": stats.snapshot()} if stats is not None else {}
+
+
+# actor models compared by bench_actors
+ACTOR_MODELS = ("threads", "asyncio")
+
+
+def _rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def percentiles(samples_ns: List[int]) -> Dict[str, float]:
+    """p50/p99/p999 and max of nanosecond samples, in microseconds."""
+    if not samples_ns:
+        return {"p50_us": 0.0, "p99_us": 0.0, "p999_us": 0.0, "max_us": 0.0}
+    s = sorted(samples_ns)
+
+    def at(q: float) -> float:
+        return s[min(len(s) - 1, int(q * len(s)))] / 1000.0
+
+    return {"p50_us": at(0.50), "p99_us": at(0.99), "p999_us": at(0.999), "max_us": s[-1] / 1000.0}
+
+
+def _run_threads(targets) -> Dict[str, float]:
+    """Run callables in threads, return wall and process CPU seconds."""
+    threads = [threading.Thread(target=t, daemon=True) for t in targets]
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return {"wall_s": time.perf_counter() - wall0, "cpu_s": time.process_time() - cpu0}
+
+
+def bench_prodcons(engine: str, buffer_size: int, items: int, producers: int = 1,
+                   consumers: int = 1, batch: int = 1, lock_stats: bool = False,
+                   overflow: str = BLOCK) -> dict:
+    """
+    Move `items` timestamps from producers to consumers with zero delay.
+    Handoff latency is the time from creating an item to taking it out;
+    put latency is one put/put_many call, bounded by a non-blocking overflow
+    policy at the price of the dropped/rejected items.
+    """
+    if engine == "ring" and (producers, consumers) != (1, 1):
+        raise ValueError("the ring engine is single-producer single-consumer")
+    buffer = ENGINES[engine](buffer_size, producers + consumers)
+    if getattr(buffer, "parties", None) is not None and buffer.parties < producers + consumers:
+        raise ValueError(f"{engine} supports {buffer.parties} threads")
+    if overflow != BLOCK:
+        if not hasattr(buffer, "set_overflow"):
+            raise ValueError(f"engine {engine!r} has no overflow policies")
+        buffer.set_overflow(overflow)
+    _enable_stats(getattr(buffer, "lock", None), lock_stats)
+    per_producer = [items // producers + (1 if i < items % producers else 0) for i in range(producers)]
+    produced_done = threading.Event()
+    remaining = [producers]
+    remaining_lock = threading.Lock()
+    latencies: List[List[int]] = [[] for _ in range(consumers)]
+    put_waits: List[List[int]] = [[] for _ in range(producers)]
+    clock = time.perf_counter_ns
+
+    def producer(count: int, waits: List[int]):
+        def run():
+            try:
+                buffer.register()
+                left = count
+                while left > 0:
+                    n = min(batch, left)
+                    t0 = clock()
+                    if n == 1:
+                        buffer.put(t0)
+                    else:
+                        buffer.put_many([t0] * n)
+                    waits.append(clock() - t0)
+                    left -= n
+            finally:
+                buffer.unregister()
+                with remaining_lock:
+                    remaining[0] -= 1
+                    if remaining[0] == 0:
+                        produced_done.set()
+        return run
+
+    def consumer(out: List[int]):
+        def run():
+            try:
+                buffer.register()
+                while True:
+                    got = buffer.get_many(batch, block=True, timeout=0.01)
+                    if got:
+                        now = clock()
+                        out.extend(now - ts for ts in got)
+                    elif produced_done.is_set() and buffer.size() == 0:
+                        break
+            finally:
+                buffer.unregister()
+        return run
+
+    timing = _run_threads([producer(c, w) for c, w in zip(per_producer, put_waits)]
+                          + [consumer(out) for out in latencies])
+    samples = [x for out in latencies for x in out]
+    return {
+        "workload": "prodcons",
+        "engine": engine,
+        "buffer_size": buffer_size,
+        "items": items,
+        "producers": producers,
+        "consumers": consumers,
+        "batch": batch,
+        "overflow": overflow,
+        "consumed": len(samples),
+        "dropped": getattr(buffer, "dropped", 0),
+        "rejected": getattr(buffer, "rejected", 0),
+        **timing,
+        "ops_per_s": len(samples) / timing["wall_s"] if timing["wall_s"] else 0.0,
+        "handoff_latency": percentiles(samples),
+        "put_latency": percentiles([x for w in put_waits for x in w]),
+        **_stats_of(getattr(buffer, "lock", None)),
+    }
+
+
+def bench_lock(lock: str, threads: int, iterations: int, lock_stats: bool = False) -> dict:
+    """Each thread enters the critical section `iterations` times; latency is acquire wait."""
+    lk = LOCKS[lock](threads)
+    if getattr(lk, "parties", None) is not None and lk.parties < threads:
+        raise ValueError(f"{lock} supports {lk.parties} threads")
+    _enable_stats(lk, lock_stats)
+    counter = [0]
+    done = [0] * threads  # iterations each worker finished, so a dead worker shows up as missing ops
+    waits: List[List[int]] = [[] for _ in range(threads)]
+    clock = time.perf_counter_ns
+
+    def worker(pid: int, out: List[int]):
+        def run():
+            for _ in range(iterations):
+                t0 = clock()
+                lk.acquire(pid)
+                out.append(clock() - t0)
+                counter[0] += 1
+                lk.release(pid)
+                done[pid] += 1
+        return run
+
+    timing = _run_threads([worker(i, waits[i]) for i in range(threads)])
+    total = sum(done)
+    return {
+        "workload": "lock",
+        "lock": lock,
+        "threads": threads,
+        "iterations": iterations,
+        "completed": total,
+        "lost_updates": total - counter[0],
+        **timing,
+        "ops_per_s": total / timing["wall_s"] if timing["wall_s"] else 0.0,
+        "acquire_latency": percentiles([x for out in waits for x in out]),
+        **_stats_of(lk),
+    }
+
+
+def bench_filewriter(path: str, threads: int, lines: int, flush_bytes: int = 4096,
+                     lock_stats: bool = False) -> dict:
+    """Threads append lines through SharedMutex + FileAppender; latency is one append."""
+    mutex = SharedMutex()
+    _enable_stats(mutex, lock_stats)
+    appender = FileAppender(path, flush_bytes=flush_bytes)
+    appender.clear()
+    waits: List[List[int]] = [[] for _ in range(threads)]
+    clock = time.perf_counter_ns
+
+    def worker(tid: int, out: List[int]):
+        def run():
+            line = f"thread-{tid}"
+            for _ in range(lines):
+                t0 = clock()
+                with mutex:
+                    appender.append_line(line)
+                out.append(clock() - t0)
+        return run
+
+    try:
+        timing = _run_threads([worker(i, waits[i]) for i in range(threads)])
+        appender.flush()
+        size = os.path.getsize(path)
+    finally:
+        appender.close()
+    total = threads * lines
+    return {
+        "workload": "filewriter",
+        "threads": threads,
+        "lines": lines,
+        "flush_bytes": flush_bytes,
+        "bytes_written": size,
+        **timing,
+        "ops_per_s": total / timing["wall_s"] if timing["wall_s"] else 0.0,
+        "append_latency": percentiles([x for out in waits for x in out]),
+        **_stats_of(mutex),
+    }
+
+
+def bench_actors(model: str, actors: int, items: int, buffer_size: int = 100) -> dict:
+    """
+    `actors` producers and `actors` consumers move `items` timestamps through
+    one bounded buffer, as OS threads (ThreadSafeBuffer + SharedMutex) or as
+    coroutines (AsyncBuffer). Reports per-actor memory (Python heap via
+    tracemalloc, RSS where /proc is available), spawn time, throughput and
+    handoff latency, i.e. the scheduling overhead of each model.
+    """
+    per_producer = [items // actors + (1 if i < items % actors else 0) for i in range(actors)]
+    latencies: List[List[int]] = [[] for _ in range(actors)]
+    clock = time.perf_counter_ns
+    rss0 = _rss_bytes()
+    tracemalloc.start()
+    heap0 = tracemalloc.get_traced_memory()[0]
+    cpu0 = time.process_time()
+
+    if model == "threads":
+        buffer = ThreadSafeBuffer(max_size=buffer_size, lock=SharedMutex())
+        done = threading.Event()
+        remaining = [actors]
+        remaining_lock = threading.Lock()
+        ready = threading.Barrier(2 * actors + 1)
+
+        def producer(count: int):
+            ready.wait()
+            for _ in range(count):
+                buffer.put(clock())
+            with remaining_lock:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    done.set()
+
+        def consumer(out: List[int]):
+            ready.wait()
+            while True:
+                got = buffer.get(block=True, timeout=0.01)
+                if got is not None:
+                    out.append(clock() - got)
+                elif done.is_set() and buffer.size() == 0:
+                    break
+
+        t0 = time.perf_counter()
+        threads = [threading.Thread(target=producer, args=(c,), daemon=True) for c in per_producer]
+        threads += [threading.Thread(target=consumer, args=(out,), daemon=True) for out in latencies]
+        for t in threads:
+            t.start()
+        spawn_s = time.perf_counter() - t0
+        heap1, rss1 = tracemalloc.get_traced_memory()[0], _rss_bytes()
+        tracemalloc.stop()
+        wall0 = time.perf_counter()
+        ready.wait()
+        for t in threads:
+            t.join()
+        wall_s = time.perf_counter() - wall0
+    elif model == "asyncio":
+        async def main():
+            buffer = AsyncBuffer(max_size=buffer_size)
+
+            async def producer(count: int):
+                for _ in range(count):
+                    await buffer.put(clock())
+
+            async def consumer(out: List[int]):
+                while True:
+                    got = await buffer.get()
+                    out.append(clock() - got)
+
+            t0 = time.perf_counter()
+            producers = [asyncio.create_task(producer(c)) for c in per_producer]
+            consumers = [asyncio.create_task(consumer(out)) for out in latencies]
+            spawn_s = time.perf_counter() - t0
+            await asyncio.sleep(0)  # let every task allocate its frame
+            heap1, rss1 = tracemalloc.get_traced_memory()[0], _rss_bytes()
+            tracemalloc.stop()
+            wall0 = time.perf_counter()
+            await asyncio.gather(*producers)
+            # a consumer records its item in the same step it takes it out
+            while buffer.size():
+                await asyncio.sleep(0)
+            for task in consumers:
+                task.cancel()
+            await asyncio.gather(*consumers, return_exceptions=True)
+            return spawn_s, heap1, rss1, time.perf_counter() - wall0
+
+        spawn_s, heap1, rss1, wall_s = asyncio.run(main())
+    else:
+        tracemalloc.stop()
+        raise ValueError(f"unknown actor model: {model}")
+
+    cpu_s = time.process_time() - cpu0
+    samples = [x for out in latencies for x in out]
+    total = 2 * actors
+    return {
+        "workload": "actors",
+        "engine": model,
+        "actors": total,
+        "items": items,
+        "buffer_size": buffer_size,
+        "consumed": len(samples),
+        "spawn_s": spawn_s,
+        "heap_per_actor_bytes": (heap1 - heap0) / total,
+        "rss_per_actor_bytes": (rss1 - rss0) / total if rss0 is not None and rss1 is not None else None,
+        "wall_s": wall_s,
+        "cpu_s": cpu_s,
+        "ops_per_s": len(samples) / wall_s if wall_s else 0.0,
+        "handoff_latency": percentiles(samples),
+    }
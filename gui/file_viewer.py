@@ -0,0 +1,190 @@
+import tkinter as tk
+from tkinter import ttk
+from tkinter import font as tkfont
+from utils.line_index import LineIndex
+
+ACTIVE_SEGMENT = "текущий"
+
+
+class VirtualFileView(ttk.Frame):
+    """
+    Read-only view of a text file of any size. Only the lines that fit in the
+    widget are read (through a LineIndex) and inserted into the tk.Text; the
+    scrollbar, mouse wheel, search and "to end" work in line numbers. While
+    scrolled to the bottom the view follows new lines.
+
+    With `manifest_getter` (returning the writer's SegmentManifest) a selector
+    lists sealed segments; only the chosen segment is opened.
+    """
+
+    def __init__(self, master, path: str, manifest_getter=None):
+        super().__init__(master)
+        self.index = LineIndex(path)
+        self._manifest_getter = manifest_getter
+        self._segment_count = 0
+        self._line_base = 0
+        self._first = 0
+        self._rows = 12
+        self._follow = True
+        self._match_line = None
+
+        bar = ttk.Frame(self)
+        bar.pack(fill=tk.X, padx=10, pady=(10, 0))
+        self._search_var = tk.StringVar()
+        search = ttk.Entry(bar, textvariable=self._search_var)
+        search.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        search.bind("<Return>", lambda _e: self.find_next())
+        ttk.Button(bar, text="Найти", command=self.find_next).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(bar, text="Назад", command=lambda: self.find_next(backwards=True)).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(bar, text="В начало", command=self.to_start).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Button(bar, text="В конец", command=self.to_end).pack(side=tk.LEFT, padx=(5, 0))
+        self._lines_lbl = ttk.Label(bar, text="")
+        self._lines_lbl.pack(side=tk.RIGHT, padx=(10, 0))
+        self._segment_var = tk.StringVar(value=ACTIVE_SEGMENT)
+        if manifest_getter is not None:
+            self._segment_box = ttk.Combobox(bar, textvariable=self._segment_var, state="readonly",
+                                             width=20, values=[ACTIVE_SEGMENT])
+            self._segment_box.pack(side=tk.RIGHT, padx=(10, 0))
+            self._segment_box.bind("<<ComboboxSelected>>", lambda _e: self._open_segment())
+            ttk.Label(bar, text="Сегмент:").pack(side=tk.RIGHT)
+
+        body = ttk.Frame(self)
+        body.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self._scroll = ttk.Scrollbar(body, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self._scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text = tk.Text(body, height=12, wrap=tk.NONE, state=tk.DISABLED)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.text.tag_configure("match", background="#ffe680")
+
+        self.text.bind("<Configure>", self._on_resize)
+        self.text.bind("<MouseWheel>", lambda e: self._scroll_by(-1 if e.delta > 0 else 1, "units", 3))
+        self.text.bind("<Button-4>", lambda _e: self._scroll_by(-1, "units", 3))
+        self.text.bind("<Button-5>", lambda _e: self._scroll_by(1, "units", 3))
+        self.text.bind("<Prior>", lambda _e: self._scroll_by(-1, "pages"))
+        self.text.bind("<Next>", lambda _e: self._scroll_by(1, "pages"))
+
+    def set_path(self, path: str, rescan: bool = False):
+        """
+        Show another file, or the current one again from the top. rescan=True
+        drops the index even for the same path (the file was just truncated
+        and may already have grown past its old size).
+        """
+        self._segment_var.set(ACTIVE_SEGMENT)
+        self._show(path, follow=True, rescan=rescan)
+
+    def _show(self, path: str, follow: bool, rescan: bool = False):
+        if rescan or path != self.index.path:
+            self.index.reset(path)
+        # same file: update() extends the index, or starts over if it was truncated or replaced
+        self._first = 0
+        self._follow = follow
+        self._match_line = None
+        self._sync_segments()
+        self.index.update()
+        self._render()
+
+    def _sync_segments(self) -> bool:
+        """Refresh the segment list and the global number of the first shown line."""
+        if self._manifest_getter is None:
+            return False
+        manifest = self._manifest_getter()
+        segments = manifest.segments()
+        changed = len(segments) != self._segment_count
+        if changed:
+            self._segment_count = len(segments)
+            self._segment_box.configure(values=[ACTIVE_SEGMENT] + [s["name"] for s in segments])
+        name = self._segment_var.get()
+        if name == ACTIVE_SEGMENT:
+            self._line_base = segments[-1]["first_line"] + segments[-1]["lines"] if segments else 0
+        else:
+            entry = next((s for s in segments if s["name"] == name), None)
+            self._line_base = entry["first_line"] if entry else 0
+        return changed
+
+    def _open_segment(self):
+        name = self._segment_var.get()
+        manifest = self._manifest_getter()
+        if name == ACTIVE_SEGMENT:
+            self._show(manifest.path, follow=True)
+            return
+        entry = next((s for s in manifest.segments() if s["name"] == name), None)
+        if entry is None:
+            self._segment_var.set(ACTIVE_SEGMENT)
+            self._show(manifest.path, follow=True)
+            return
+        self._show(manifest.readable_path(entry), follow=False)
+
+    def refresh(self) -> bool:
+        """Pick up appended lines; True if the view changed."""
+        segments_changed = self._sync_segments()
+        if not self.index.update():
+            return segments_changed
+        self._render()
+        return True
+
+    def _max_first(self) -> int:
+        return max(0, self.index.line_count - self._rows)
+
+    def _render(self):
+        total = self.index.line_count
+        if self._follow:
+            self._first = self._max_first()
+        self._first = max(0, min(self._first, self._max_first()))
+        lines = self.index.read_lines(self._first, self._rows)
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(lines))
+        if self._match_line is not None and self._first <= self._match_line < self._first + self._rows:
+            row = self._match_line - self._first + 1
+            self.text.tag_add("match", f"{row}.0", f"{row}.end")
+        self.text.configure(state=tk.DISABLED)
+        if total:
+            self._scroll.set(self._first / total, min(1.0, (self._first + self._rows) / total))
+        else:
+            self._scroll.set(0.0, 1.0)
+        base = self._line_base
+        self._lines_lbl.configure(text=f"строки {base + self._first + 1 if total else base}–"
+                                       f"{base + min(total, self._first + self._rows)} из {base + total}")
+
+    def _go(self, first: int):
+        self._first = max(0, min(first, self._max_first()))
+        self._follow = self._first >= self._max_first()
+        self._render()
+
+    def _scroll_by(self, n: int, what: str, step: int = 1):
+        self._go(self._first + n * (self._rows if what == "pages" else step))
+        return "break"
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self._go(int(float(args[1]) * self.index.line_count))
+        elif args[0] == "scroll":
+            self._scroll_by(int(args[1]), args[2])
+
+    def _on_resize(self, event):
+        linespace = tkfont.nametofont(self.text.cget("font")).metrics("linespace")
+        rows = max(1, event.height // max(1, linespace))
+        if rows != self._rows:
+            self._rows = rows
+            self._render()
+
+    def to_start(self):
+        self._go(0)
+
+    def to_end(self):
+        self._go(self._max_first())
+
+    def find_next(self, backwards: bool = False):
+        needle = self._search_var.get()
+        if not needle:
+            return
+        if self._match_line is None:
+            start = self._first
+        else:
+            start = self._match_line if backwards else self._match_line + 1
+        line = self.index.search(needle, start, backwards=backwards)
+        if line is None:
+            self.bell()
+            return
+        self._match_line = line
+        self._go(line - self._rows // 2)
@@ -0,0 +1,88 @@
+import sys
+import time
+
+
+class _Task:
+    __slots__ = ("tab", "callback", "base", "max", "interval", "due")
+
+    def __init__(self, tab, callback, interval_ms: int, max_interval_ms: int):
+        self.tab = tab
+        self.callback = callback
+        self.base = interval_ms
+        self.max = max_interval_ms
+        self.interval = interval_ms
+        self.due = 0.0
+
+
+class FrameScheduler:
+    """
+    One Tk after() loop driving every periodic UI refresh.
+
+    Render callbacks are registered per tab and return True when they changed
+    something on screen. Callbacks of hidden tabs are not run at all; a
+    callback that reports no change is called less and less often (interval
+    doubles up to max_interval_ms) and returns to its base rate on the next
+    change or when its tab is shown again.
+    """
+
+    def __init__(self, widget):
+        self._widget = widget
+        self._tasks: list[_Task] = []
+        self._active = None
+        self._job = None
+
+    def register(self, tab, callback, interval_ms: int, max_interval_ms: int | None = None):
+        """tab=None: run regardless of the selected tab."""
+        task = _Task(tab, callback, interval_ms, max_interval_ms or interval_ms * 8)
+        self._tasks.append(task)
+        self._reschedule()
+        return task
+
+    def unregister(self, task):
+        if task in self._tasks:
+            self._tasks.remove(task)
+
+    def set_active(self, tab):
+        """Called when the selected tab changes; refreshes it right away."""
+        self._active = tab
+        for task in self._tasks:
+            if task.tab is tab:
+                task.interval = task.base
+                task.due = 0.0
+        self._reschedule()
+
+    def _visible(self, task) -> bool:
+        return task.tab is None or task.tab is self._active
+
+    def _run(self):
+        self._job = None
+        now = time.monotonic() * 1000.0
+        try:
+            for task in list(self._tasks):
+                if not self._visible(task) or task.due > now:
+                    continue
+                try:
+                    changed = task.callback()
+                except Exception:
+                    changed = True
+                    self._widget.winfo_toplevel().report_callback_exception(*sys.exc_info())
+                task.interval = task.base if changed else min(task.interval * 2, task.max)
+                task.due = now + task.interval
+        finally:
+            self._reschedule()
+
+    def _reschedule(self):
+        if self._job is not None:
+            self._widget.after_cancel(self._job)
+            self._job = None
+        due = [t.due for t in self._tasks if self._visible(t)]
+        if not due:
+            return
+        delay = min(due) - time.monotonic() * 1000.0
+        self._job = self._widget.after(max(1, int(delay)), self._run)
+
+    def stop(self):
+        if self._job is not None:
+            self._widget.after_cancel(self._job)
+            self._job = None
+        self._tasks.clear()
@@ -0,0 +1,45 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class LockStatsPanel(ttk.LabelFrame):
+    """
+    Switch for a lock's contention instrumentation plus a live summary line.
+    `lock_getter` returns the current lock (or None when the engine has none).
+    """
+
+    def __init__(self, master, lock_getter, text="Профилирование блокировки"):
+        super().__init__(master, text=text)
+        self._lock_getter = lock_getter
+        self._enabled = tk.BooleanVar(value=False)
+
+        ttk.Checkbutton(self, text="Включить", variable=self._enabled,
+                        command=self.apply).pack(side=tk.LEFT, padx=10, pady=6)
+        self._label = ttk.Label(self, text="—")
+        self._label.pack(side=tk.LEFT, padx=(0, 10))
+        self.refresh()
+
+    def apply(self):
+        """Push the switch state to the current lock (call after swapping locks)."""
+        lock = self._lock_getter()
+        if lock is not None and hasattr(lock, "set_stats_enabled"):
+            lock.set_stats_enabled(self._enabled.get())
+
+    def refresh(self) -> bool:
+        """Render the current snapshot; True if the text changed."""
+        lock = self._lock_getter()
+        stats = getattr(lock, "stats", None)
+        if stats is None:
+            text = "—" if self._enabled.get() or lock is None else "выключено"
+        else:
+            s = stats.snapshot()
+            text = (
+                f"захватов: {s['acquisitions']}  |  конкурентных: {s['contention_ratio']:.0%}  |  "
+                f"циклов ожидания: {s['spins']} (уступок: {s['yields']})  |  "
+                f"ожидание p50/p99/max: {s['wait_p50_us']:.0f}/{s['wait_p99_us']:.0f}/{s['wait_max_us']:.0f} мкс  |  "
+                f"удержание ср./max: {s['hold_avg_us']:.0f}/{s['hold_max_us']:.0f} мкс"
+            )
+        if text == self._label.cget("text"):
+            return False
+        self._label.configure(text=text)
+        return True
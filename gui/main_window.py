@@ -1,14 +1,50 @@
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox
-from gui.tab_file_write import FileWriteTab
-from gui.tab_prod_cons import ProdConsTab
-from gui.tab_help import HelpTab
+from tkinter import ttk
+from gui.frame_scheduler import FrameScheduler
+from utils import trace
+
+# Tab classes are imported on first use. The imports are plain statements in
+# functions rather than importlib calls so PyInstaller still finds the modules.
+def _file_write_tab():
+    from gui.tab_file_write import FileWriteTab
+    return FileWriteTab
+
+
+def _prod_cons_tab():
+    from gui.tab_prod_cons import ProdConsTab
+    return ProdConsTab
+
+
+def _help_tab():
+    from gui.tab_help import HelpTab
+    return HelpTab
+
+
+# notebook tabs, built on first selection: (title, class loader, takes the scheduler)
+TABS = (
+    ("Запись в файл", _file_write_tab, True),
+    ("Производитель-потребитель", _prod_cons_tab, True),
+    ("Справка", _help_tab, False),
+)
 
 
 class MainWindow(ttk.Frame):
+    """
+    The notebook starts with empty placeholder frames; a tab's module is
+    imported and the tab (its threads, files and refresh callbacks) built
+    only when it is first selected, after the window has been shown.
+    Generates <<TabBuilt>> after each build; `first_paint` is the
+    perf_counter() time the window was first drawn.
+    """
+
     def __init__(self, master: tk.Misc):
         super().__init__(master)
         self.pack(fill=tk.BOTH, expand=True)
+        self.scheduler = FrameScheduler(self)
+        # placeholder frame -> built tab
+        self.tabs: dict[ttk.Frame, ttk.Frame] = {}
+        self.first_paint: float | None = None
         self._make_style()
         self._build()
         self._bind_close()
@@ -26,14 +62,15 @@ class MainWindow(ttk.Frame):
     def _build(self):
         notebook = ttk.Notebook(self)
         notebook.pack(fill=tk.BOTH, expand=True)
+        self.notebook = notebook
 
-        self.tab1 = FileWriteTab(notebook)
-        self.tab2 = ProdConsTab(notebook)
-        self.tab3 = HelpTab(notebook)
-
-        notebook.add(self.tab1, text="Запись в файл")
-        notebook.add(self.tab2, text="Производитель-потребитель")
-        notebook.add(self.tab3, text="Справка")
+        self._specs = {}
+        for title, loader, scheduled in TABS:
+            holder = ttk.Frame(notebook)
+            notebook.add(holder, text=title)
+            self._specs[holder] = (loader, scheduled)
+        notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        notebook.bind("<Map>", lambda _e: self.after_idle(self._show_first_tab))
 
         self.columnconfigure(0, weight=1)
         self.rowconfigure(0, weight=1)
@@ -41,13 +78,36 @@ class MainWindow(ttk.Frame):
     def _bind_close(self):
         self.master.protocol("WM_DELETE_WINDOW", self._on_close)
 
+    def _tab(self, holder):
+        tab = self.tabs.get(holder)
+        if tab is None:
+            loader, scheduled = self._specs[holder]
+            tab_cls = loader()
+            tab = tab_cls(holder, self.scheduler) if scheduled else tab_cls(holder)
+            self.tabs[holder] = tab
+            self.event_generate("<<TabBuilt>>")
+        return tab
+
+    def _show_first_tab(self):
+        if self.first_paint is not None:
+            return
+        # draw the window with the empty notebook before building anything heavy
+        self.update_idletasks()
+        self.first_paint = time.perf_counter()
+        self._on_tab_changed()
+
+    def _on_tab_changed(self, _event=None):
+        if self.first_paint is None:
+            return
+        # only the selected tab's render callbacks run
+        self.scheduler.set_active(self._tab(self.notebook.nametowidget(self.notebook.select())))
+
     def _on_close(self):
-        try:
-            self.tab1.shutdown()
-        except Exception:
-            pass
-        try:
-            self.tab2.shutdown()
-        except Exception:
-            pass
+        self.scheduler.stop()
+        for tab in self.tabs.values():
+            try:
+                getattr(tab, "shutdown", lambda: None)()
+            except Exception:
+                pass
+        trace.stop_tracing()
         self.master.destroy()
@@ -4,14 +4,22 @@ from tkinter import filedialog
 import queue
 from threads.file_writer import FileWriterThread, TimeWriterThread
 from synchronization.mutex_manager import SharedMutex
-from utils.file_manager import read_all_text, clear_file
+from utils.file_manager import FileAppender
+from gui.lock_stats_view import LockStatsPanel
+from gui.file_viewer import VirtualFileView
 import os
 
 
+# segment rotation choices: label -> bytes / seconds (0 = off)
+ROTATE_SIZES = {"выкл": 0, "64 КБ": 64 << 10, "1 МБ": 1 << 20, "16 МБ": 16 << 20}
+ROTATE_AGES = {"выкл": 0, "1 мин": 60, "10 мин": 600, "1 ч": 3600}
+
+
 class FileWriteTab(ttk.Frame):
-    def __init__(self, master):
+    def __init__(self, master, scheduler):
         super().__init__(master)
         self.pack(fill=tk.BOTH, expand=True)
+        self.scheduler = scheduler
         self.mutex = SharedMutex()
         self.text_queue: "queue.Queue[str]" = queue.Queue()
         self.file_path = os.path.abspath("user.txt")
@@ -19,13 +27,14 @@ class FileWriteTab(ttk.Frame):
         self._entered_text = ""
         self._file_path_var = tk.StringVar(value=self.file_path)
 
-        self._refresh_job = None
-
-        self.user_thread = FileWriterThread(self.text_queue, self.file_path, self.mutex)
-        self.time_thread = TimeWriterThread(self.file_path, self.mutex)
+        self.appender = FileAppender(self.file_path)
+        self.user_thread = FileWriterThread(self.text_queue, self.appender, self.mutex)
+        self.time_thread = TimeWriterThread(self.appender, self.mutex)
 
         self._build_ui()
-        self._refresh_file_view()
+        self._append_file_changes()
+        self.scheduler.register(self, self._append_file_changes, 250, 2000)
+        self.scheduler.register(self, self._mutex_stats.refresh, 500)
 
     def _build_ui(self):
         container = ttk.Frame(self)
@@ -54,7 +63,8 @@ class FileWriteTab(ttk.Frame):
         controls.columnconfigure(1, weight=1)
         controls.columnconfigure(2, weight=1)
 
-        self.user_speed = self._thread_controls(controls, 0, "Поток пользователя", lambda: self.user_thread)
+        self.user_speed = self._thread_controls(controls, 0, "Поток пользователя", lambda: self.user_thread,
+                                                with_batch=True)
         self.time_speed = self._thread_controls(controls, 1, "Поток времени", lambda: self.time_thread)
 
         file_ctrl = ttk.LabelFrame(controls, text="Файл")
@@ -66,18 +76,37 @@ class FileWriteTab(ttk.Frame):
         ttk.Label(path_row, textvariable=self._file_path_var).pack(side=tk.LEFT, padx=(6, 6), fill=tk.X, expand=True)
         ttk.Button(path_row, text="...", width=3, command=self._choose_file).pack(side=tk.RIGHT)
 
+        rot_row = ttk.Frame(file_ctrl)
+        rot_row.pack(fill=tk.X, padx=10, pady=(0, 6))
+        ttk.Label(rot_row, text="Ротация:").pack(side=tk.LEFT)
+        self._rot_size = ttk.Combobox(rot_row, values=list(ROTATE_SIZES), state="readonly", width=7)
+        self._rot_size.set("выкл")
+        self._rot_size.pack(side=tk.LEFT, padx=(6, 0))
+        self._rot_age = ttk.Combobox(rot_row, values=list(ROTATE_AGES), state="readonly", width=7)
+        self._rot_age.set("выкл")
+        self._rot_age.pack(side=tk.LEFT, padx=(6, 0))
+        self._rot_gzip = tk.BooleanVar(value=False)
+        ttk.Checkbutton(rot_row, text="gzip", variable=self._rot_gzip,
+                        command=self._apply_rotation).pack(side=tk.LEFT, padx=(6, 0))
+        for box in (self._rot_size, self._rot_age):
+            box.bind("<<ComboboxSelected>>", lambda _e: self._apply_rotation())
+
         btn_row = ttk.Frame(file_ctrl)
         btn_row.pack(fill=tk.X, padx=10, pady=(0, 10))
         ttk.Button(btn_row, text="Очистить", command=self._clear_current_file).pack(side=tk.LEFT)
         ttk.Button(btn_row, text="Обновить", command=self._render_file_content).pack(side=tk.RIGHT)
 
+        self._mutex_stats = LockStatsPanel(container, lambda: self.mutex, text="Профилирование мьютекса")
+        self._mutex_stats.pack(fill=tk.X, pady=(10, 0))
+
         self.file_frame = ttk.LabelFrame(container, text=f"Содержимое файла: {self.file_path}")
         self.file_frame.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
 
-        self.file_text = tk.Text(self.file_frame, height=12, wrap=tk.WORD, state=tk.DISABLED)
-        self.file_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.file_view = VirtualFileView(self.file_frame, self.file_path,
+                                         manifest_getter=lambda: self.appender.manifest)
+        self.file_view.pack(fill=tk.BOTH, expand=True)
 
-    def _thread_controls(self, parent, col, title, thread_getter):
+    def _thread_controls(self, parent, col, title, thread_getter, with_batch=False):
         frame = ttk.LabelFrame(parent, text=title)
         frame.grid(row=0, column=col, sticky="nsew", padx=(0 if col == 0 else 10, 0))
 
@@ -89,6 +118,22 @@ class FileWriteTab(ttk.Frame):
         ttk.Label(frame, text="Задержка (с)").pack(anchor=tk.W, padx=10, pady=(8, 0))
         spd.pack(fill=tk.X, padx=10)
 
+        if with_batch:
+            # 1 byte = char by char; more = drain the queue in batches
+            batch_lbl = ttk.Label(frame, text="Пакет: 1 Б")
+            batch = ttk.Scale(frame, from_=1, to=4096, orient=tk.HORIZONTAL)
+
+            def on_batch(v):
+                n = int(float(v))
+                batch_lbl.configure(text=f"Пакет: {n} Б")
+                thread_getter().set_batch_bytes(n)
+
+            batch.configure(command=on_batch)
+            batch.set(1)
+            batch_lbl.pack(anchor=tk.W, padx=10, pady=(8, 0))
+            batch.pack(fill=tk.X, padx=10)
+            self.user_batch = batch
+
         btns = ttk.Frame(frame)
         btns.pack(fill=tk.X, padx=10, pady=8)
         ttk.Button(btns, text="Запуск", command=lambda: thread_getter().start_safe()).pack(side=tk.LEFT)
@@ -101,15 +146,17 @@ class FileWriteTab(ttk.Frame):
 
         def poll_status():
             st = thread_getter().status
+            if st == status.cget("text"):
+                return False
             if st == "RUNNING":
                 status.configure(text=st, style="Status.OK.TLabel")
             elif st == "PAUSED":
                 status.configure(text=st, style="Status.PAUSED.TLabel")
             else:
                 status.configure(text=st, style="Status.STOP.TLabel")
-            self.after(300, poll_status)
+            return True
 
-        poll_status()
+        self.scheduler.register(self, poll_status, 300)
         return spd
 
     def _choose_file(self):
@@ -133,18 +180,26 @@ class FileWriteTab(ttk.Frame):
 
         self.file_path = new_path
         self._file_path_var.set(self.file_path)
-        self.user_thread = FileWriterThread(self.text_queue, self.file_path, self.mutex)
-        self.time_thread = TimeWriterThread(self.file_path, self.mutex)
+        with self.mutex:
+            self.appender.reopen(self.file_path)
+        self.user_thread = FileWriterThread(self.text_queue, self.appender, self.mutex)
+        self.time_thread = TimeWriterThread(self.appender, self.mutex)
 
         if hasattr(self, "user_speed"):
             self.user_thread.set_delay(float(self.user_speed.get()))
         if hasattr(self, "time_speed"):
             self.time_thread.set_delay(float(self.time_speed.get()))
+        if hasattr(self, "user_batch"):
+            self.user_thread.set_batch_bytes(int(float(self.user_batch.get())))
 
         if hasattr(self, "file_frame"):
             self.file_frame.configure(text=f"Содержимое файла: {self.file_path}")
         self._render_file_content()
 
+    def _apply_rotation(self):
+        self.appender.set_rotation(ROTATE_SIZES[self._rot_size.get()], ROTATE_AGES[self._rot_age.get()],
+                                   self._rot_gzip.get())
+
     def _add_text(self):
         text = self.entry.get()
         if not text:
@@ -167,20 +222,17 @@ class FileWriteTab(ttk.Frame):
 
     def _clear_current_file(self):
         with self.mutex:
-            clear_file(self.file_path)
-        self._render_file_content()
+            self.appender.clear()
+        self.file_view.set_path(self.file_path, rescan=True)
 
     def _render_file_content(self):
-        content = read_all_text(self.file_path)
-        self.file_text.configure(state=tk.NORMAL)
-        self.file_text.delete("1.0", tk.END)
-        self.file_text.insert("1.0", content)
-        self.file_text.configure(state=tk.DISABLED)
+        # back to the top of the current file; the viewer keeps its line index
+        self.file_view.set_path(self.file_path)
 
-    def _refresh_file_view(self):
-        self._render_file_content()
-        self._refresh_job = self.after(1000, self._refresh_file_view)
+    def _append_file_changes(self) -> bool:
+        return self.file_view.refresh()
 
     def shutdown(self):
         self.user_thread.stop()
         self.time_thread.stop()
+        self.appender.close()
@@ -74,6 +74,8 @@ class HelpTab(ttk.Frame):
         self._add_h2("Управление")
         self._add_bullet("Можно менять задержку каждого потока отдельно.")
         self._add_bullet("Файл можно выбрать вручную и очищать кнопкой 'Очистить'.")
+        self._add_bullet("Просмотр файла читает только видимые строки, поэтому работает быстро даже с очень большими файлами; есть поиск и переход в конец.")
+        self._add_bullet("Ротация: по размеру или времени файл закрывается в пронумерованный сегмент (с опциональным gzip), в просмотре можно выбрать нужный сегмент.")
 
         self._add_h1("Задача 2: Производитель–потребитель")
         self._add_body(
@@ -83,6 +85,14 @@ class HelpTab(ttk.Frame):
         self._add_bullet("Производитель помещает элементы в общий потокобезопасный буфер.")
         self._add_bullet("Потребитель извлекает элементы из этого буфера.")
         self._add_bullet("Интерфейс показывает текущее содержимое и заполненность буфера.")
+        self._add_bullet("Взаимное исключение в буфере — алгоритм Деккера или мьютекс (переключается в управлении).")
+        self._add_bullet("Кольцевой буфер без блокировок: один производитель и один потребитель, слоты в заранее выделенном массиве.")
+        self._add_bullet("Режим процессов: производитель и потребитель — отдельные процессы, буфер и переменные Деккера лежат в общей памяти.")
+        self._add_bullet("Потребителей может быть несколько (пул, размер меняется на ходу); для Деккера и кольца — один, для пекарни и турнира — до 8. Таблица показывает счётчик и скорость каждого. «Останов» сначала дочищает буфер.")
+        self._add_bullet("При переполнении буфер может ждать (в том числе не дольше 0.5 с), отклонять новые элементы, вытеснять старые или отбрасывать новые; потери считаются в статистике. Флажок «Притормаживать» останавливает производителя на 80% заполнения до спада к 50%.")
+        self._add_bullet("«Записать трассу» сохраняет события буфера, блокировок и потоков записи в компактный двоичный файл; «Воспроизвести» проигрывает его в этой вкладке. Экспорт для chrome://tracing: python -m utils.trace chrome файл.trace -o файл.json.")
+        self._add_bullet("Производитель при полном буфере и потребитель при пустом засыпают и просыпаются сразу, как только появится место или данные.")
+        self._add_bullet("Режим asyncio: производители и потребители — корутины в отдельном цикле событий; их число задаётся полем «Корутин», один и тот же счётчик статистики.")
 
         self._add_h1("Синхронизация")
         self._add_body(
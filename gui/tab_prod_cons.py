@@ -1,23 +1,97 @@
+import struct
+import time
 import tkinter as tk
-from tkinter import ttk
-from utils.buffer import ThreadSafeBuffer
+from tkinter import ttk, filedialog, messagebox
+from utils.buffer import ThreadSafeBuffer, BLOCK, REJECT, DROP_OLDEST, DROP_NEWEST
+from utils.ring_buffer import SpscRingBuffer
+from utils.shm_buffer import SharedRingBuffer
+from utils.async_buffer import AsyncBuffer
+from utils.stats import ThroughputSampler
+from utils.rate_control import RateController, PID, AIMD, OCCUPANCY, LATENCY, PRODUCER, CONSUMER
+from utils import trace
+from synchronization.dekker_algorithm import DekkerLock
+from synchronization.mutex_manager import SharedMutex
+from synchronization.bakery_algorithm import BakeryLock
+from synchronization.tournament_lock import TournamentLock
 from threads.producer import ProducerThread
 from threads.consumer import ConsumerThread
+from threads.processes import ProducerProcess, ConsumerProcess
+from threads.pool import WorkerPool
+from threads.async_engine import AsyncEngine, AsyncActorGroup, AsyncProducer, AsyncConsumer
+from gui.lock_stats_view import LockStatsPanel
+
+
+# most consumers in the pool; N-party locks get one more slot for the producer
+POOL_MAX = 8
+
+# full-buffer behaviour: name -> (policy, timeout)
+OVERFLOW_KINDS = {
+    "Ждать": (BLOCK, None),
+    "Ждать ≤ 0.5 с, затем отклонить": (BLOCK, 0.5),
+    "Отклонить": (REJECT, None),
+    "Вытеснить старые": (DROP_OLDEST, None),
+    "Отбросить новые": (DROP_NEWEST, None),
+}
+
+# watermarks for producer throttling, as fractions of max_size
+HIGH_WATERMARK = 0.8
+LOW_WATERMARK = 0.5
+
+# rate controller: name -> mode; name -> (metric, target unit in seconds or fraction, default)
+CONTROL_KINDS = {"PID": PID, "AIMD": AIMD}
+CONTROL_TARGETS = {
+    "Заполненность, %": (OCCUPANCY, 0.01, 50),
+    "Задержка, мс": (LATENCY, 0.001, 100),
+}
+CONTROL_INTERVAL_MS = 250
+CONTROL_LOG = 50
+
+# buffer engines selectable in the tab: name -> factory(max_size)
+BUFFER_KINDS = {
+    "Деккер": lambda n: ThreadSafeBuffer(max_size=n, lock=DekkerLock()),
+    "Мьютекс": lambda n: ThreadSafeBuffer(max_size=n, lock=SharedMutex()),
+    "Пекарня (N потоков)": lambda n: ThreadSafeBuffer(max_size=n, lock=BakeryLock(POOL_MAX + 1)),
+    "Турнир (N потоков)": lambda n: ThreadSafeBuffer(max_size=n, lock=TournamentLock(POOL_MAX + 1)),
+    "Кольцо (без блокировок)": lambda n: SpscRingBuffer(max_size=n),
+    "Процессы (общая память)": lambda n: SharedRingBuffer(max_size=n),
+    "asyncio (корутины)": lambda n: AsyncBuffer(max_size=n),
+}
 
 
 class ProdConsTab(ttk.Frame):
-    def __init__(self, master):
+    def __init__(self, master, scheduler):
         super().__init__(master)
         self.pack(fill=tk.BOTH, expand=True)
+        self.scheduler = scheduler
 
         self.buffer_max = 100
-        self.buffer = ThreadSafeBuffer(max_size=self.buffer_max)
+        self._buffer_kind = tk.StringVar(value="Деккер")
+        self._overflow_kind = tk.StringVar(value="Ждать")
+        self._throttle = tk.BooleanVar(value=False)
+        self._auto = tk.BooleanVar(value=False)
+        self._control_kind = tk.StringVar(value="PID")
+        self._control_target = tk.StringVar(value="Заполненность, %")
+        self._controller = None
+        self._control_task = None
+        self._control_prev = None
+        self.buffer = self._make_buffer()
+        self._engine = None
 
-        self._produced = tk.IntVar(value=0)
-        self._consumed = tk.IntVar(value=0)
+        # totals of workers from previous buffers; live ones are summed per frame
+        self._count_base = [0, 0]
+        self._sampler = ThroughputSampler()
+        # seq range [first, end) of the rows currently in the listbox
+        self._shown = (0, 0)
+        self._view_key = None
 
         self._build_ui()
         self._wire_threads()
+        self.scheduler.register(self, self._poll_status, 300)
+        self.scheduler.register(self, self._poll_buffer_view, 100, 1600)
+        # memory_usage walks every item under the buffer's read lock: a slow task of its own
+        self.scheduler.register(self, self._poll_memory, 2000)
+        self.scheduler.register(self, self._lock_stats.refresh, 500)
+        self.scheduler.register(self, self._poll_workers, 1000)
 
     def _build_ui(self):
         container = ttk.Frame(self)
@@ -35,28 +109,134 @@ class ProdConsTab(ttk.Frame):
         self.progress = ttk.Progressbar(left, mode="determinate", maximum=self.buffer_max)
         self.progress.pack(fill=tk.X, padx=10, pady=(0, 10))
 
+        # Buffer synchronization
+        sync = ttk.Frame(right)
+        sync.pack(fill=tk.X, padx=10, pady=(8, 6))
+        ttk.Label(sync, text="Синхронизация:").pack(side=tk.LEFT)
+        kind_box = ttk.Combobox(sync, textvariable=self._buffer_kind, values=list(BUFFER_KINDS),
+                                state="readonly", width=22)
+        kind_box.pack(side=tk.LEFT, padx=(6, 0))
+        kind_box.bind("<<ComboboxSelected>>", lambda _e: self._rebuild_buffer())
+
+        # full-buffer policy and watermark throttling (ThreadSafeBuffer only)
+        overflow = ttk.Frame(right)
+        overflow.pack(fill=tk.X, padx=10, pady=(0, 6))
+        ttk.Label(overflow, text="При переполнении:").pack(side=tk.LEFT)
+        overflow_box = ttk.Combobox(overflow, textvariable=self._overflow_kind, values=list(OVERFLOW_KINDS),
+                                    state="readonly", width=28)
+        overflow_box.pack(side=tk.LEFT, padx=(6, 0))
+        overflow_box.bind("<<ComboboxSelected>>", lambda _e: self._apply_overflow())
+        ttk.Checkbutton(right, text=f"Притормаживать производителя ({HIGH_WATERMARK:.0%} → {LOW_WATERMARK:.0%})",
+                        variable=self._throttle, command=self._apply_overflow).pack(anchor=tk.W, padx=10, pady=(0, 6))
+
+        # asyncio engine: how many coroutine actors of each kind to start
+        actors = ttk.Frame(right)
+        actors.pack(fill=tk.X, padx=10, pady=(0, 6))
+        ttk.Label(actors, text="Корутин (asyncio):").pack(side=tk.LEFT)
+        self._actors_spin = ttk.Spinbox(actors, from_=1, to=100000, width=8, command=self._apply_actors)
+        self._actors_spin.set(1000)
+        self._actors_spin.pack(side=tk.LEFT, padx=(6, 0))
+        self._actors_spin.bind("<Return>", lambda _e: self._apply_actors())
+        self._actors_spin.bind("<FocusOut>", lambda _e: self._apply_actors())
+
+        # event trace: record this run, or play a recorded one back into the views
+        trace_row = ttk.Frame(right)
+        trace_row.pack(fill=tk.X, padx=10, pady=(0, 6))
+        self._trace_btn = ttk.Button(trace_row, text="Записать трассу…", command=self._toggle_trace)
+        self._trace_btn.pack(side=tk.LEFT)
+        ttk.Button(trace_row, text="Воспроизвести…", command=self._replay_trace).pack(side=tk.LEFT, padx=(6, 0))
+
+        self._build_controller_ui(right)
+
         # Controls for producer and consumer
         self._prod_controls = self._thread_controls(right, title="Производитель")
         ttk.Separator(right, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=6)
-        self._cons_controls = self._thread_controls(right, title="Потребитель")
+        self._cons_controls = self._thread_controls(right, title="Потребители")
+        self._build_pool_ui(self._cons_controls["frame"])
 
         # Stats
         stats = ttk.LabelFrame(container, text="Статистика")
         stats.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(10, 0))
-        ttk.Label(stats, textvariable=self._produced).pack(side=tk.LEFT, padx=10, pady=6)
+        self._produced_lbl = ttk.Label(stats, text="0")
+        self._produced_lbl.pack(side=tk.LEFT, padx=10, pady=6)
         ttk.Label(stats, text="— произведено").pack(side=tk.LEFT)
         ttk.Label(stats, text="  |  ").pack(side=tk.LEFT)
-        ttk.Label(stats, textvariable=self._consumed).pack(side=tk.LEFT)
+        self._consumed_lbl = ttk.Label(stats, text="0")
+        self._consumed_lbl.pack(side=tk.LEFT)
         ttk.Label(stats, text="— потреблено").pack(side=tk.LEFT)
         ttk.Label(stats, text="  |  ").pack(side=tk.LEFT)
         self._buf_size_lbl = ttk.Label(stats, text="Буфер: 0")
         self._buf_size_lbl.pack(side=tk.LEFT)
+        ttk.Label(stats, text="  |  ").pack(side=tk.LEFT)
+        self._mem_lbl = ttk.Label(stats, text="Память: 0 Б")
+        self._mem_lbl.pack(side=tk.LEFT)
+        ttk.Label(stats, text="  |  ").pack(side=tk.LEFT)
+        self._rate_lbl = ttk.Label(stats, text="Скорость: 0 / 0 эл/с")
+        self._rate_lbl.pack(side=tk.LEFT)
+        ttk.Label(stats, text="  |  ").pack(side=tk.LEFT)
+        self._occupancy_lbl = ttk.Label(stats, text="Заполненность (ср.): 0%")
+        self._occupancy_lbl.pack(side=tk.LEFT)
+        ttk.Label(stats, text="  |  ").pack(side=tk.LEFT)
+        self._lost_lbl = ttk.Label(stats, text="Отброшено: 0, отклонено: 0")
+        self._lost_lbl.pack(side=tk.LEFT)
+
+        self._lock_stats = LockStatsPanel(container, lambda: getattr(self.buffer, "lock", None))
+        self._lock_stats.grid(row=2, column=0, columnspan=2, sticky="ew", pady=(10, 0))
 
         container.columnconfigure(0, weight=2)
         container.columnconfigure(1, weight=1)
         container.rowconfigure(0, weight=1)
 
-        self.after(300, self._poll_buffer_view)
+    def _build_controller_ui(self, parent):
+        frame = ttk.LabelFrame(parent, text="Регулятор скорости")
+        frame.pack(fill=tk.X, padx=10, pady=(0, 6))
+        ttk.Checkbutton(frame, text="Подбирать задержки автоматически", variable=self._auto,
+                        command=self._apply_controller).pack(anchor=tk.W, padx=10, pady=(6, 0))
+        row = ttk.Frame(frame)
+        row.pack(fill=tk.X, padx=10, pady=(6, 0))
+        mode_box = ttk.Combobox(row, textvariable=self._control_kind, values=list(CONTROL_KINDS),
+                                state="readonly", width=6)
+        mode_box.pack(side=tk.LEFT)
+        mode_box.bind("<<ComboboxSelected>>", lambda _e: self._apply_controller())
+        target_box = ttk.Combobox(row, textvariable=self._control_target, values=list(CONTROL_TARGETS),
+                                  state="readonly", width=18)
+        target_box.pack(side=tk.LEFT, padx=(6, 0))
+        target_box.bind("<<ComboboxSelected>>", lambda _e: self._on_control_target())
+        ttk.Label(row, text="цель").pack(side=tk.LEFT, padx=(6, 0))
+        self._target_spin = ttk.Spinbox(row, from_=1, to=10000, width=6, command=self._apply_controller)
+        self._target_spin.set(CONTROL_TARGETS[self._control_target.get()][2])
+        self._target_spin.pack(side=tk.LEFT, padx=(6, 0))
+        self._target_spin.bind("<Return>", lambda _e: self._apply_controller())
+        self._target_spin.bind("<FocusOut>", lambda _e: self._apply_controller())
+        self._control_lbl = ttk.Label(frame, text="Выключен")
+        self._control_lbl.pack(anchor=tk.W, padx=10, pady=(6, 0))
+        # direction changes only: a steady ramp is one line, not one per step
+        self._control_log = tk.Listbox(frame, height=4)
+        self._control_log.pack(fill=tk.X, padx=10, pady=(6, 10))
+
+    def _build_pool_ui(self, frame):
+        row = ttk.Frame(frame)
+        row.pack(fill=tk.X, padx=10, pady=(0, 6))
+        ttk.Label(row, text="Потоков в пуле").pack(side=tk.LEFT)
+        self._pool_spin = ttk.Spinbox(row, from_=1, to=POOL_MAX, width=4, command=self._apply_pool_size)
+        self._pool_spin.set(1)
+        self._pool_spin.pack(side=tk.LEFT, padx=(6, 0))
+        self._pool_spin.bind("<Return>", lambda _e: self._apply_pool_size())
+        self._pool_spin.bind("<FocusOut>", lambda _e: self._apply_pool_size())
+        self._pool_limit_lbl = ttk.Label(row, text="")
+        self._pool_limit_lbl.pack(side=tk.LEFT, padx=(6, 0))
+
+        self._workers_view = ttk.Treeview(frame, columns=("status", "count", "rate"), height=4)
+        self._workers_view.heading("#0", text="№")
+        self._workers_view.heading("status", text="Статус")
+        self._workers_view.heading("count", text="Обработано")
+        self._workers_view.heading("rate", text="эл/с")
+        self._workers_view.column("#0", width=40, stretch=False)
+        for col, width in (("status", 80), ("count", 90), ("rate", 60)):
+            self._workers_view.column(col, width=width, anchor=tk.E)
+        self._workers_view.pack(fill=tk.X, padx=10, pady=(0, 10))
+        # per-worker (time, count) of the previous frame, for rates
+        self._worker_prev: dict[int, tuple[float, int]] = {}
 
     def _thread_controls(self, parent, title: str):
         frame = ttk.LabelFrame(parent, text=title)
@@ -67,6 +247,13 @@ class ProdConsTab(ttk.Frame):
         ttk.Label(frame, text="Задержка (с)").pack(anchor=tk.W, padx=10, pady=(8, 0))
         spd.pack(fill=tk.X, padx=10)
 
+        batch_row = ttk.Frame(frame)
+        batch_row.pack(fill=tk.X, padx=10, pady=(6, 0))
+        ttk.Label(batch_row, text="Пакет (эл.)").pack(side=tk.LEFT)
+        batch = ttk.Spinbox(batch_row, from_=1, to=1000, width=6)
+        batch.set(1)
+        batch.pack(side=tk.LEFT, padx=(6, 0))
+
         btns = ttk.Frame(frame)
         btns.pack(fill=tk.X, padx=10, pady=8)
         start_b = ttk.Button(btns, text="Запуск")
@@ -84,6 +271,7 @@ class ProdConsTab(ttk.Frame):
         return {
             "frame": frame,
             "speed": spd,
+            "batch": batch,
             "start": start_b,
             "pause": pause_b,
             "resume": resume_b,
@@ -92,8 +280,33 @@ class ProdConsTab(ttk.Frame):
         }
 
     def _wire_threads(self):
-        self.producer = ProducerThread(self.buffer, on_produced=self._on_produced)
-        self.consumer = ConsumerThread(self.buffer, on_consumed=self._on_consumed)
+        # workers only bump their own `count`; the GUI sums them once per frame
+        if isinstance(self.buffer, SharedRingBuffer):
+            self.producer = ProducerProcess(self.buffer)
+        elif isinstance(self.buffer, trace.TraceReplay):
+            self.producer = self.buffer.producer
+            self.consumer = self.buffer.consumer
+        elif isinstance(self.buffer, AsyncBuffer):
+            # the event loop runs in its own thread; the Tk thread only posts control calls
+            self._engine = AsyncEngine()
+            actors = self._spin_value(self._actors_spin)
+            self.producer = AsyncActorGroup(self._engine, AsyncProducer, self.buffer, actors)
+            self.consumer = AsyncActorGroup(self._engine, AsyncConsumer, self.buffer, actors)
+        else:
+            self.producer = ProducerThread(self.buffer)
+        if not isinstance(self.buffer, (AsyncBuffer, trace.TraceReplay)):
+            # the producer holds one party of the buffer's lock, consumers share the rest
+            parties = self.buffer.parties
+            limit = POOL_MAX if parties is None else min(POOL_MAX, parties - 1)
+            if isinstance(self.buffer, SharedRingBuffer):
+                factory = lambda: ConsumerProcess(self.buffer)
+            else:
+                factory = lambda: ConsumerThread(self.buffer)
+            self.consumer = WorkerPool(factory, self._spin_value(self._pool_spin), limit)
+            self._pool_spin.configure(to=limit)
+            self._pool_spin.set(self.consumer.size)
+            self._pool_limit_lbl.configure(text=f"(макс. {limit})")
+        self._worker_prev = {}
 
         # Wire speeds
         self._prod_controls["speed"].configure(command=lambda v: self.producer.set_delay(float(v)))
@@ -101,6 +314,14 @@ class ProdConsTab(ttk.Frame):
         self.producer.set_delay(self._prod_controls["speed"].get())
         self.consumer.set_delay(self._cons_controls["speed"].get())
 
+        # Wire batch sizes
+        for ctrl, th in ((self._prod_controls, self.producer), (self._cons_controls, self.consumer)):
+            apply = (lambda c=ctrl, t=th: t.set_batch_size(self._spin_value(c["batch"])))
+            ctrl["batch"].configure(command=apply)
+            ctrl["batch"].bind("<Return>", lambda _e, f=apply: f())
+            ctrl["batch"].bind("<FocusOut>", lambda _e, f=apply: f())
+            apply()
+
         # Wire buttons
         self._prod_controls["start"].configure(command=self.producer.start_safe)
         self._prod_controls["pause"].configure(command=self.producer.pause)
@@ -111,38 +332,236 @@ class ProdConsTab(ttk.Frame):
         self._cons_controls["pause"].configure(command=self.consumer.pause)
         self._cons_controls["resume"].configure(command=self.consumer.resume)
         self._cons_controls["stop"].configure(command=self.consumer.stop)
+        self._apply_controller()
 
-        # Status polling
-        def poll_status():
-            for ctrl, th in ((self._prod_controls, self.producer), (self._cons_controls, self.consumer)):
-                st = th.status
-                if st == "RUNNING":
-                    ctrl["status"].configure(text=st, style="Status.OK.TLabel")
-                elif st == "PAUSED":
-                    ctrl["status"].configure(text=st, style="Status.PAUSED.TLabel")
-                else:
-                    ctrl["status"].configure(text=st, style="Status.STOP.TLabel")
-            self.after(300, poll_status)
-
-        poll_status()
-
-    def _poll_buffer_view(self):
-        # Update listbox snapshot
-        items = list(self.buffer.snapshot())[-50:]  # show tail
-        self.listbox.delete(0, tk.END)
-        for it in items:
-            self.listbox.insert(tk.END, str(it))
+    def _poll_status(self) -> bool:
+        changed = False
+        for ctrl, th in ((self._prod_controls, self.producer), (self._cons_controls, self.consumer)):
+            st = th.status
+            if st == ctrl["status"].cget("text"):
+                continue
+            changed = True
+            if st == "RUNNING":
+                ctrl["status"].configure(text=st, style="Status.OK.TLabel")
+            elif st == "PAUSED":
+                ctrl["status"].configure(text=st, style="Status.PAUSED.TLabel")
+            else:
+                ctrl["status"].configure(text=st, style="Status.STOP.TLabel")
+        return changed
+
+    def _apply_overflow(self, buffer=None):
+        buffer = buffer or self.buffer
+        if not isinstance(buffer, ThreadSafeBuffer):
+            return
+        buffer.set_overflow(*OVERFLOW_KINDS[self._overflow_kind.get()])
+        if self._throttle.get():
+            buffer.set_watermarks(int(self.buffer_max * HIGH_WATERMARK), int(self.buffer_max * LOW_WATERMARK))
+        else:
+            buffer.set_watermarks(None)
+
+    def _on_control_target(self):
+        self._target_spin.set(CONTROL_TARGETS[self._control_target.get()][2])
+        self._apply_controller()
+
+    def _apply_controller(self):
+        """(Re)create the rate controller for the current workers, or hand the delays back to the sliders."""
+        enabled = self._auto.get() and not isinstance(self.buffer, trace.TraceReplay)
+        for ctrl in (self._prod_controls, self._cons_controls):
+            ctrl["speed"].state(["disabled"] if enabled else ["!disabled"])
+        if not enabled:
+            if self._controller is not None:
+                self._controller = None
+                self.scheduler.unregister(self._control_task)
+                self._control_task = None
+                self.producer.set_delay(self._prod_controls["speed"].get())
+                self.consumer.set_delay(self._cons_controls["speed"].get())
+            self._control_lbl.configure(text="Выключен")
+            return
+        metric, unit, _default = CONTROL_TARGETS[self._control_target.get()]
+        target = self._spin_value(self._target_spin) * unit
+        if metric == OCCUPANCY:
+            target = min(target, 0.95)
+        self._controller = RateController(self.buffer, self.producer, self.consumer, target=target,
+                                          metric=metric, mode=CONTROL_KINDS[self._control_kind.get()])
+        self._controller.reset(self._prod_controls["speed"].get())
+        self._control_prev = None
+        if self._control_task is None:
+            # not bound to the tab: the workers keep running while another tab is shown
+            self._control_task = self.scheduler.register(None, self._control_tick, CONTROL_INTERVAL_MS)
+
+    def _control_tick(self) -> bool:
+        decision = self._controller.step() if self._controller is not None else None
+        if decision is None:
+            return True
+        measured = decision["measured"]
+        if decision["metric"] == OCCUPANCY:
+            shown = f"заполненность {measured:.0%} → {decision['target']:.0%}"
+        else:
+            shown = f"задержка {measured * 1000:.0f} → {decision['target'] * 1000:.0f} мс"
+        arrows = {1: "↑", -1: "↓", 0: "="}
+        text = (f"Произв. {decision['producer_delay']:.3f} с {arrows[decision[PRODUCER]]}, "
+                f"потр. {decision['consumer_delay']:.3f} с {arrows[decision[CONSUMER]]}; {shown}")
+        self._control_lbl.configure(text=text)
+        directions = (decision[PRODUCER], decision[CONSUMER])
+        if directions != self._control_prev:
+            self._control_prev = directions
+            self._control_log.insert(0, time.strftime("%H:%M:%S  ") + text)
+            self._control_log.delete(CONTROL_LOG, tk.END)
+        return True  # fixed rate: the controller must not be backed off like a render callback
+
+    def _apply_pool_size(self):
+        if isinstance(self.consumer, WorkerPool):
+            self._pool_spin.set(self.consumer.resize(self._spin_value(self._pool_spin)))
+
+    def _poll_workers(self) -> bool:
+        """Per-worker status, count and rate of the consumer pool."""
+        stats = self.consumer.worker_stats() if isinstance(self.consumer, WorkerPool) else []
+        now = time.monotonic()
+        rows = []
+        for st in stats:
+            t0, c0 = self._worker_prev.get(st["index"], (now, st["count"]))
+            rate = (st["count"] - c0) / (now - t0) if now > t0 else 0.0
+            self._worker_prev[st["index"]] = (now, st["count"])
+            rows.append((str(st["index"] + 1), (st["status"], st["count"], f"{rate:.0f}")))
+        view = self._workers_view
+        old = view.get_children()
+        if [(view.item(i, "text"), tuple(str(v) for v in view.item(i, "values"))) for i in old] == \
+                [(n, tuple(str(v) for v in vals)) for n, vals in rows]:
+            return False
+        for i in old[len(rows):]:
+            view.delete(i)
+        for k, (n, vals) in enumerate(rows):
+            if k < len(old):
+                view.item(old[k], text=n, values=vals)
+            else:
+                view.insert("", tk.END, text=n, values=vals)
+        return True
+
+    def _apply_actors(self):
+        # a new actor count takes effect on the next start
+        if isinstance(self.buffer, AsyncBuffer):
+            n = self._spin_value(self._actors_spin)
+            self.producer.set_size(n)
+            self.consumer.set_size(n)
+
+    @staticmethod
+    def _spin_value(spin) -> int:
+        try:
+            return max(1, int(spin.get()))
+        except ValueError:
+            return 1
+
+    def _make_buffer(self):
+        buffer = BUFFER_KINDS[self._buffer_kind.get()](self.buffer_max)
+        self._apply_overflow(buffer)
+        return buffer
+
+    def _toggle_trace(self):
+        if trace.ACTIVE is not None:
+            trace.stop_tracing()
+            self._trace_btn.configure(text="Записать трассу…")
+            return
+        path = filedialog.asksaveasfilename(
+            title="Файл трассы",
+            defaultextension=".trace",
+            filetypes=[("Trace files", "*.trace"), ("All files", "*.*")],
+            initialfile=time.strftime("prodcons-%Y%m%d-%H%M%S.trace"),
+        )
+        if path:
+            trace.start_tracing(path)
+            self._trace_btn.configure(text="Остановить запись")
+
+    def _replay_trace(self):
+        path = filedialog.askopenfilename(
+            title="Файл трассы",
+            filetypes=[("Trace files", "*.trace"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+        try:
+            replay = trace.TraceReplay(path)
+        except (OSError, ValueError, struct.error) as e:
+            messagebox.showerror("Воспроизведение трассы", f"Не удалось прочитать трассу:\n{e}", parent=self)
+            return
+        self._rebuild_buffer(replay)
+        # replay totals are the recorded run's own
+        self._count_base = [0, 0]
+
+    def _rebuild_buffer(self, buffer=None):
+        # threads are bound to the old buffer; stop them and start over
+        self.shutdown()
+        produced, consumed = self._totals()
+        self._count_base = [produced, consumed]
+        self.buffer = buffer if buffer is not None else self._make_buffer()
+        self._shown = (0, 0)
+        self._view_key = None
+        self._lock_stats.apply()
+        self._wire_threads()
+
+    def _totals(self):
+        return (self._count_base[0] + self.producer.count,
+                self._count_base[1] + self.consumer.count)
+
+    def _poll_buffer_view(self) -> bool:
+        window = self.buffer.tail(50)
         size = self.buffer.size()
+        st = self._sampler.sample(*self._totals(), size / self.buffer_max)
+        lost = (self.buffer.dropped, self.buffer.rejected) if isinstance(self.buffer, ThreadSafeBuffer) else (0, 0)
+        key = (window[0][0] if window else None, len(window), size, st["produced"], st["consumed"],
+               round(st["produced_per_s"]), round(st["consumed_per_s"]), round(st["occupancy_avg"], 2), lost)
+        if key == self._view_key:
+            return False
+        self._view_key = key
+        self._render_tail(window)
         self.progress.configure(value=size)
         self._buf_size_lbl.configure(text=f"Буфер: {size}")
-        self.after(400, self._poll_buffer_view)
+        self._render_stats(st)
+        self._lost_lbl.configure(text=f"Отброшено: {lost[0]}, отклонено: {lost[1]}")
+        return True
 
-    def _on_produced(self, item):
-        self._produced.set(self._produced.get() + 1)
+    def _poll_memory(self) -> bool:
+        text = f"Память: {self.buffer.memory_usage()} Б"
+        if self._mem_lbl.cget("text") == text:
+            return False
+        self._mem_lbl.configure(text=text)
+        return True
+
+    def _render_tail(self, window):
+        """Update the listbox to `window` [(seq, item)], touching only changed rows."""
+        first_old, end_old = self._shown
+        first = window[0][0] if window else end_old
+        end = window[-1][0] + 1 if window else end_old
+        if first < first_old or end < end_old or first >= end_old:
+            # new buffer or no overlap: redraw everything
+            self.listbox.delete(0, tk.END)
+            new_rows = window
+        else:
+            if first > first_old:
+                self.listbox.delete(0, first - first_old - 1)
+            new_rows = [(seq, it) for seq, it in window if seq >= end_old]
+        for _seq, it in new_rows:
+            self.listbox.insert(tk.END, str(it))
+        self._shown = (first, end)
 
-    def _on_consumed(self, item):
-        self._consumed.set(self._consumed.get() + 1)
+    def _render_stats(self, st: dict):
+        self._produced_lbl.configure(text=str(st["produced"]))
+        self._consumed_lbl.configure(text=str(st["consumed"]))
+        self._rate_lbl.configure(
+            text=f"Скорость: {st['produced_per_s']:.0f} / {st['consumed_per_s']:.0f} эл/с"
+        )
+        self._occupancy_lbl.configure(text=f"Заполненность (ср.): {st['occupancy_avg']:.0%}")
 
     def shutdown(self):
         self.producer.stop()
-        self.consumer.stop()
+        if isinstance(self.consumer, WorkerPool):
+            self.consumer.stop(drain=0)  # the buffer is being dropped, nothing to drain for
+        else:
+            self.consumer.stop()
+        if isinstance(self.buffer, SharedRingBuffer):
+            # let the worker processes detach before the segment is unlinked
+            self.producer.join(timeout=1.0)
+            self.consumer.join(timeout=1.0)
+            self.buffer.close()
+        if self._engine is not None:
+            self._engine.close()
+            self._engine = None
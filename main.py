@@ -1,8 +1,44 @@
-import tkinter as tk
-from gui.main_window import MainWindow
+import time
 
+_T0 = time.perf_counter()
 
-def run_app():
+# imported after _T0 on purpose: --startup-timing reports their cost as "imports"
+import json  # noqa: E402
+import multiprocessing  # noqa: E402
+import sys  # noqa: E402
+import tkinter as tk  # noqa: E402
+from gui.main_window import MainWindow  # noqa: E402
+
+_T_IMPORTS = time.perf_counter()
+
+
+def _ms(t: float) -> float:
+    return round((t - _T0) * 1000.0, 1)
+
+
+def _watch_startup(root: tk.Tk, window: MainWindow, t_window: float):
+    """
+    --startup-timing: print import, window, first-paint and first-tab times
+    (ms since main.py started) as JSON, then quit. Interpreter start-up itself
+    is not included; `python -X importtime main.py` breaks imports down further.
+    """
+
+    def tab_built(_event=None):
+        tab = next(iter(window.tabs.values()))
+        marks = {
+            "imports_ms": _ms(_T_IMPORTS),
+            "window_ms": _ms(t_window),
+            "first_paint_ms": _ms(window.first_paint),
+            "first_tab_ms": _ms(time.perf_counter()),
+            "first_tab": type(tab).__name__,
+        }
+        print(json.dumps(marks))
+        root.after_idle(window._on_close)
+
+    window.bind("<<TabBuilt>>", tab_built)
+
+
+def run_app(startup_timing: bool = False):
     root = tk.Tk()
     root.title("Синхронизация процессов: Мьютексы и Деккер")
     root.geometry("1000x700")
@@ -12,9 +48,13 @@ def run_app():
         windll.shcore.SetProcessDpiAwareness(1)  # type: ignore[attr-defined]
     except Exception:
         pass
-    MainWindow(root)
+    window = MainWindow(root)
+    if startup_timing:
+        _watch_startup(root, window, time.perf_counter())
     root.mainloop()
 
 
 if __name__ == "__main__":
-    run_app()
+    # producer/consumer processes re-enter this script in frozen builds
+    multiprocessing.freeze_support()
+    run_app(startup_timing="--startup-timing" in sys.argv[1:])
@@ -0,0 +1,107 @@
+"""
+Headless runner for the producer/consumer and file-writer workloads.
+
+    python -m os_lw run scenario.toml
+    python -m os_lw run --duration 60 --set prodcons.lock=mutex --set prodcons.consumers.count=4
+    python -m os_lw defaults          # print the full default scenario
+
+Prints one {"metrics": ...} JSON line per interval on stdout and a final
+{"summary": ...} line; exits 1 if items were lost without the overflow policy
+accounting for them, 2 on an invalid scenario, 130 when interrupted before the
+end. Does not import tkinter, so it runs on display-less machines.
+
+Scenario (.toml or .json; every key optional, see `defaults`):
+
+    duration = 30
+    metrics_interval = 1.0
+    [prodcons]
+    lock = "bakery"
+    buffer_size = 64
+    producer = { delay = 0.001, batch = 8 }
+    consumers = { count = 4, delay = 0.002, batch = 4 }
+    controller = { mode = "pid", target = 0.5 }   # adjusts both delays live
+    [filewriter]
+    path = "soak.txt"
+    rotate_bytes = 1048576
+"""
+import argparse
+import json
+import signal
+import sys
+from os_lw.runner import (CONTROLLER_DEFAULTS, DEFAULTS, FILEWRITER_DEFAULTS, ScenarioRunner, fill_defaults,
+                          load_scenario)
+
+# sections that are null by default; setting one of their keys enables them with the defaults
+_SECTIONS = {"filewriter": FILEWRITER_DEFAULTS, "controller": CONTROLLER_DEFAULTS}
+
+
+def _apply_override(scenario: dict, assignment: str):
+    """--set a.b.c=value, value parsed as JSON when possible (null disables a section)."""
+    key, _, raw = assignment.partition("=")
+    try:
+        value = json.loads(raw)
+    except json.JSONDecodeError:
+        value = raw
+    *parents, leaf = key.split(".")
+    node = scenario
+    for name in parents:
+        if name not in node:
+            raise ValueError(f"unknown scenario key: {key}")
+        if node[name] is None and name in _SECTIONS:
+            node[name] = json.loads(json.dumps(_SECTIONS[name]))
+        node = node[name]
+        if not isinstance(node, dict):
+            raise ValueError(f"unknown scenario key: {key} ({name} is not a section)")
+    if leaf not in node:
+        raise ValueError(f"unknown scenario key: {key}")
+    node[leaf] = value
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m os_lw", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("run", help="run a scenario and stream JSON metrics")
+    p.add_argument("scenario", nargs="?", help=".toml or .json scenario file (default: built-in defaults)")
+    p.add_argument("--duration", type=float, help="override the scenario duration (seconds)")
+    p.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                   help="override one scenario key, e.g. prodcons.consumers.count=4")
+    sub.add_parser("defaults", help="print the default scenario as JSON")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "defaults":
+        prodcons = {**DEFAULTS["prodcons"], "controller": CONTROLLER_DEFAULTS}
+        print(json.dumps({**DEFAULTS, "prodcons": prodcons, "filewriter": FILEWRITER_DEFAULTS}, indent=2))
+        return 0
+
+    try:
+        scenario = load_scenario(args.scenario)
+        for assignment in args.set:
+            _apply_override(scenario, assignment)
+        if args.duration is not None:
+            scenario["duration"] = args.duration
+        scenario = fill_defaults(scenario)  # a section set whole with --set may be partial
+        runner = ScenarioRunner(scenario, emit=lambda line: print(line, flush=True))
+    except ValueError as e:
+        print(f"invalid scenario: {e}", file=sys.stderr)
+        return 2
+    interrupted = []
+
+    def on_signal(_signum, _frame):
+        interrupted.append(True)
+        runner.stop()
+
+    signal.signal(signal.SIGINT, on_signal)
+    signal.signal(signal.SIGTERM, on_signal)
+    summary = runner.run()
+    print(json.dumps({"summary": summary}), flush=True)
+    if not summary["ok"]:
+        return 1
+    return 130 if interrupted and scenario["duration"] is not None else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+"""
+Headless scenario runner: the prod-cons and file-writer workloads of the GUI
+driven by threads only, with periodic JSON metrics. Must not import tkinter.
+"""
+import json
+import math
+import os
+import queue
+import threading
+import time
+from synchronization.mutex_manager import SharedMutex
+from threads.file_writer import FileWriterThread, TimeWriterThread
+from threads.pool import WorkerPool
+from threads.producer import ConsumerThread, ProducerThread
+from utils import trace
+from utils.buffer import BLOCK, OVERFLOW_POLICIES
+from utils.engines import ENGINES
+from utils.file_manager import FileAppender
+from utils.rate_control import CONTROL_METRICS, CONTROL_MODES, RateController
+from utils.stats import ThroughputSampler
+
+# defaults merged under the scenario file; a section set to null is skipped
+DEFAULTS = {
+    "duration": 10.0,          # seconds, null: until interrupted
+    "metrics_interval": 1.0,   # seconds between metric lines
+    "trace": None,             # path of a binary event trace (see utils.trace)
+    "prodcons": {
+        "lock": "dekker",      # utils.engines.ENGINES: dekker, mutex, bakery, filter, tournament, ring
+        "buffer_size": 100,
+        "overflow": "block",   # ThreadSafeBuffer policies: block, reject, drop_oldest, drop_newest
+        "producer": {"delay": 0.3, "batch": 1},
+        "consumers": {"count": 1, "delay": 0.3, "batch": 1},
+        "controller": None,    # rate controller that overrides both delays, see CONTROLLER_DEFAULTS
+    },
+    "filewriter": None,
+}
+
+FILEWRITER_DEFAULTS = {
+    "path": "user.txt",
+    "clear": False,
+    "flush_bytes": 4096,
+    "rotate_bytes": 0,
+    "rotate_age": 0.0,
+    "user": {"delay": 0.5, "batch_bytes": 1, "text": "hello", "chars_per_s": 10.0},
+    "time": {"delay": 1.0},
+}
+
+
+CONTROLLER_DEFAULTS = {
+    "mode": "pid",             # utils.rate_control: pid, aimd
+    "metric": "occupancy",     # occupancy (target: fraction of buffer_size) or latency (target: seconds)
+    "target": 0.5,
+    "interval": 0.25,          # seconds between controller steps
+    "min_delay": 0.001,
+    "max_delay": 2.0,
+}
+
+
+def _merge(defaults: dict, given: dict) -> dict:
+    out = dict(defaults)
+    for key, value in given.items():
+        if key not in defaults:
+            raise ValueError(f"unknown scenario key: {key!r}")
+        if isinstance(defaults[key], dict) and isinstance(value, dict):
+            value = _merge(defaults[key], value)
+        out[key] = value
+    return out
+
+
+def load_scenario(path: str | None) -> dict:
+    """Read a .json or .toml scenario and fill in the defaults."""
+    given = {}
+    if path:
+        if path.endswith(".toml"):
+            import tomllib
+            with open(path, "rb") as f:
+                given = tomllib.load(f)
+        else:
+            with open(path, encoding="utf-8") as f:
+                given = json.load(f)
+    return fill_defaults(given)
+
+
+def fill_defaults(given: dict) -> dict:
+    """`given` merged over the defaults, sections included, and validated."""
+    scenario = _merge(DEFAULTS, given)
+    if isinstance(scenario["filewriter"], dict):
+        scenario["filewriter"] = _merge(FILEWRITER_DEFAULTS, scenario["filewriter"])
+    if isinstance(scenario["prodcons"], dict) and isinstance(scenario["prodcons"]["controller"], dict):
+        scenario["prodcons"]["controller"] = _merge(CONTROLLER_DEFAULTS, scenario["prodcons"]["controller"])
+    validate_scenario(scenario)
+    return scenario
+
+
+def _check_number(key: str, value, minimum: float = 0.0, integer: bool = False, strict: bool = False):
+    """ValueError unless `value` is a number (an int if `integer`) >= minimum (> if `strict`)."""
+    kinds = int if integer else (int, float)
+    if isinstance(value, bool) or not isinstance(value, kinds) or math.isnan(value) \
+            or value < minimum or (strict and value == minimum):
+        kind = "an integer" if integer else "a number"
+        bound = f"> {minimum:g}" if strict else f">= {minimum:g}"
+        raise ValueError(f"{key}={value!r}: expected {kind} {bound}")
+
+
+def validate_scenario(scenario: dict):
+    """Raise ValueError with a one-line reason for settings the engines would reject mid-start."""
+    if scenario["duration"] is not None:
+        _check_number("duration", scenario["duration"], strict=True)
+    _check_number("metrics_interval", scenario["metrics_interval"], strict=True)
+    fw = scenario["filewriter"]
+    if fw:
+        for key in ("flush_bytes", "rotate_bytes"):
+            _check_number(f"filewriter.{key}", fw[key], integer=True)
+        _check_number("filewriter.rotate_age", fw["rotate_age"])
+        _check_number("filewriter.user.delay", fw["user"]["delay"])
+        _check_number("filewriter.user.batch_bytes", fw["user"]["batch_bytes"], minimum=1, integer=True)
+        _check_number("filewriter.user.chars_per_s", fw["user"]["chars_per_s"])
+        _check_number("filewriter.time.delay", fw["time"]["delay"])
+    cfg = scenario["prodcons"]
+    if not cfg:
+        return
+    _check_number("prodcons.buffer_size", cfg["buffer_size"], minimum=1, integer=True)
+    for side in ("producer", "consumers"):
+        _check_number(f"prodcons.{side}.delay", cfg[side]["delay"])
+        _check_number(f"prodcons.{side}.batch", cfg[side]["batch"], minimum=1, integer=True)
+    lock = cfg["lock"]
+    if lock not in ENGINES:
+        raise ValueError(f"prodcons.lock={lock!r}: expected one of {', '.join(sorted(ENGINES))}")
+    if cfg["overflow"] not in OVERFLOW_POLICIES:
+        raise ValueError(f"prodcons.overflow={cfg['overflow']!r}: expected one of {', '.join(OVERFLOW_POLICIES)}")
+    count = cfg["consumers"]["count"]
+    if not isinstance(count, int) or count < 1:
+        raise ValueError(f"prodcons.consumers.count={count!r}: expected a positive integer")
+    # a throwaway buffer tells what the engine supports; no threads are involved
+    probe = ENGINES[lock](1, count + 1)
+    if cfg["overflow"] != BLOCK and not hasattr(probe, "set_overflow"):
+        raise ValueError(f"prodcons.overflow={cfg['overflow']!r}: the {lock} engine only blocks")
+    if probe.parties is not None and count + 1 > probe.parties:
+        raise ValueError(f"prodcons.consumers.count={count}: the {lock} engine supports "
+                         f"{probe.parties - 1} consumer(s) next to the producer")
+    ctl = cfg["controller"]
+    if ctl:
+        ctl = _merge(CONTROLLER_DEFAULTS, ctl)
+        if ctl["mode"] not in CONTROL_MODES:
+            raise ValueError(f"prodcons.controller.mode={ctl['mode']!r}: expected one of {', '.join(CONTROL_MODES)}")
+        if ctl["metric"] not in CONTROL_METRICS:
+            raise ValueError(f"prodcons.controller.metric={ctl['metric']!r}: "
+                             f"expected one of {', '.join(CONTROL_METRICS)}")
+        _check_number("prodcons.controller.target", ctl["target"], strict=True)
+        _check_number("prodcons.controller.interval", ctl["interval"], strict=True)
+        _check_number("prodcons.controller.min_delay", ctl["min_delay"], strict=True)
+        _check_number("prodcons.controller.max_delay", ctl["max_delay"], minimum=ctl["min_delay"])
+
+
+class _Typist(threading.Thread):
+    """Feeds the user writer's queue with `text` at `chars_per_s`, like typing into the GUI."""
+
+    def __init__(self, out: "queue.Queue[str]", text: str, chars_per_s: float, stop: threading.Event):
+        super().__init__(name="Typist", daemon=True)
+        self._out = out
+        self._text = text or " "
+        self._period = 1.0 / chars_per_s if chars_per_s > 0 else 0.0
+        self._stop = stop
+
+    def run(self):
+        i = 0
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            self._out.put(self._text[i % len(self._text)])
+            i += 1
+            if i % len(self._text) == 0:
+                self._out.put("\n")
+            next_tick += self._period
+            if self._stop.wait(max(0.0, next_tick - time.monotonic())):
+                break
+
+
+class ScenarioRunner:
+    def __init__(self, scenario: dict, emit=print):
+        validate_scenario(scenario)
+        self.scenario = scenario
+        self._emit = emit
+        self._stop = threading.Event()
+        self._t0 = 0.0
+        self.buffer = self.producer = self.consumer = None
+        self.appender = self.user_thread = self.time_thread = None
+        self._typist = None
+        self.controller = None
+        self._control_interval = 0.0
+        self._sampler = ThroughputSampler(window=scenario["metrics_interval"])
+
+    def stop(self):
+        self._stop.set()
+
+    def _start_prodcons(self, cfg: dict):
+        consumers = cfg["consumers"]
+        self.buffer = ENGINES[cfg["lock"]](cfg["buffer_size"], consumers["count"] + 1)
+        if cfg["overflow"] != "block":
+            self.buffer.set_overflow(cfg["overflow"])
+        self.producer = ProducerThread(self.buffer)
+        self.producer.set_delay(cfg["producer"]["delay"])
+        self.producer.set_batch_size(cfg["producer"]["batch"])
+        parties = self.buffer.parties
+        self.consumer = WorkerPool(lambda: ConsumerThread(self.buffer), consumers["count"],
+                                   None if parties is None else parties - 1)
+        self.consumer.set_delay(consumers["delay"])
+        self.consumer.set_batch_size(consumers["batch"])
+        if cfg["controller"]:
+            ctl = _merge(CONTROLLER_DEFAULTS, cfg["controller"])
+            self.controller = RateController(self.buffer, self.producer, self.consumer, target=ctl["target"],
+                                             metric=ctl["metric"], mode=ctl["mode"],
+                                             min_delay=ctl["min_delay"], max_delay=ctl["max_delay"])
+            self.controller.reset(cfg["producer"]["delay"])
+            self._control_interval = ctl["interval"]
+        self.producer.start_safe()
+        self.consumer.start_safe()
+        self._sampler.sample(0, 0, 0.0)  # rates of the first metrics line start here
+
+    def _start_filewriter(self, cfg: dict):
+        mutex = SharedMutex()
+        self.appender = FileAppender(os.path.abspath(cfg["path"]), flush_bytes=cfg["flush_bytes"])
+        if cfg["clear"]:
+            self.appender.clear()
+        self.appender.set_rotation(cfg["rotate_bytes"], cfg["rotate_age"])
+        text_queue: "queue.Queue[str]" = queue.Queue()
+        self.user_thread = FileWriterThread(text_queue, self.appender, mutex)
+        self.user_thread.set_delay(cfg["user"]["delay"])
+        self.user_thread.set_batch_bytes(cfg["user"]["batch_bytes"])
+        self.time_thread = TimeWriterThread(self.appender, mutex)
+        self.time_thread.set_delay(cfg["time"]["delay"])
+        self._typist = _Typist(text_queue, cfg["user"]["text"], cfg["user"]["chars_per_s"], self._stop)
+        self.user_thread.start_safe()
+        self.time_thread.start_safe()
+        self._typist.start()
+
+    def metrics(self) -> dict:
+        out = {"t": round(time.monotonic() - self._t0, 3)}
+        if self.buffer is not None:
+            size = self.buffer.size()
+            st = self._sampler.sample(self.producer.count, self.consumer.count, size / self.buffer.max_size)
+            out["prodcons"] = {
+                **{k: round(v, 3) if isinstance(v, float) else v for k, v in st.items()},
+                "buffer": size,
+                "dropped": getattr(self.buffer, "dropped", 0),
+                "rejected": getattr(self.buffer, "rejected", 0),
+                "workers": self.consumer.worker_stats(),
+            }
+            if self.controller is not None and self.controller.last is not None:
+                # an unbounded latency estimate (nothing consumed yet) is null, not Infinity
+                out["prodcons"]["controller"] = {
+                    k: (round(v, 4) if math.isfinite(v) else None) if isinstance(v, float) else v
+                    for k, v in self.controller.last.items()}
+        if self.appender is not None:
+            out["filewriter"] = {
+                "user_lines": self.user_thread.count,
+                "time_lines": self.time_thread.count,
+                "segments": len(self.appender.manifest.segments()),
+            }
+        return out
+
+    def _shutdown(self) -> dict:
+        # a section may have failed half-way through its start: stop whatever exists
+        if self.producer is not None:
+            self.producer.stop()
+            self.producer.join(2.0)
+        if self.consumer is not None:
+            self.consumer.stop()  # drains what is left in the buffer
+            self.consumer.join(3.0)
+        writers = [t for t in (self.user_thread, self.time_thread) if t is not None]
+        for t in writers:
+            t.stop()
+        for t in writers:
+            t.join(2.0)
+        if self.appender is not None:
+            self.appender.close()
+        summary = {"elapsed_s": round(time.monotonic() - self._t0, 3), "ok": True}
+        if self.producer is not None and self.consumer is not None:
+            produced, consumed, left = self.producer.count, self.consumer.count, self.buffer.size()
+            dropped = getattr(self.buffer, "dropped", 0)
+            # produced counts stored items: each was consumed, is still buffered or was evicted
+            evicted = dropped if self.scenario["prodcons"]["overflow"] == "drop_oldest" else 0
+            summary["prodcons"] = {"produced": produced, "consumed": consumed, "left": left,
+                                   "dropped": dropped, "rejected": getattr(self.buffer, "rejected", 0),
+                                   "items_ok": produced == consumed + left + evicted}
+            summary["ok"] = summary["prodcons"]["items_ok"]
+        if self.user_thread is not None and self.time_thread is not None:
+            path = self.appender.path
+            summary["filewriter"] = {"path": path, "user_lines": self.user_thread.count,
+                                     "time_lines": self.time_thread.count,
+                                     "bytes": os.path.getsize(path) if os.path.exists(path) else 0}
+        return summary
+
+    def run(self) -> dict:
+        """Run until the duration passes or stop() is called; returns the summary."""
+        sc = self.scenario
+        if sc["trace"]:
+            trace.start_tracing(sc["trace"])
+        self._t0 = time.monotonic()
+        try:
+            if sc["prodcons"]:
+                self._start_prodcons(sc["prodcons"])
+            if sc["filewriter"]:
+                self._start_filewriter(sc["filewriter"])
+            deadline = None if sc["duration"] is None else self._t0 + sc["duration"]
+            next_metrics = self._t0 + sc["metrics_interval"]
+            next_control = self._t0 if self.controller is not None else None
+            while not self._stop.is_set():
+                wake = min(t for t in (next_metrics, next_control, deadline) if t is not None)
+                wait = wake - time.monotonic()
+                if wait > 0 and self._stop.wait(wait):
+                    break
+                now = time.monotonic()
+                if next_control is not None and now >= next_control:
+                    self.controller.step()
+                    next_control += self._control_interval
+                if now >= next_metrics or (deadline is not None and now >= deadline):
+                    self._emit(json.dumps({"metrics": self.metrics()}))
+                    next_metrics += sc["metrics_interval"]
+                if deadline is not None and now >= deadline:
+                    break
+        finally:
+            self._stop.set()
+            summary = self._shutdown()
+            if sc["trace"]:
+                trace.stop_tracing()
+                summary["trace"] = sc["trace"]
+        return summary
@@ -0,0 +1,44 @@
+import threading
+import time
+from synchronization.fences import FENCES, memory_fence
+
+
+class BakeryLock:
+    """Lamport's bakery algorithm for N parties (process ids 0..n-1)."""
+
+    def __init__(self, n: int):
+        if n < 1:
+            raise ValueError("n must be >= 1")
+        self.parties = n
+        self.choosing = [False] * n
+        self.number = [0] * n
+        self._fence = threading.Lock()
+
+    def acquire(self, process_id: int):
+        self.choosing[process_id] = True
+        if FENCES:
+            memory_fence(self._fence)
+        self.number[process_id] = 1 + max(self.number)
+        self.choosing[process_id] = False
+        if FENCES:
+            # our ticket must be visible before we read the others'
+            memory_fence(self._fence)
+        for other in range(self.parties):
+            if other == process_id:
+                continue
+            while self.choosing[other]:
+                time.sleep(0.0005)
+            # wait while the other holds a smaller (number, id) ticket
+            while True:
+                num = self.number[other]
+                if num == 0 or (num, other) > (self.number[process_id], process_id):
+                    break
+                time.sleep(0.0005)
+
+    def release(self, process_id: int):
+        if FENCES:
+            memory_fence(self._fence)
+        self.number[process_id] = 0
+
+    def __enter__(self):
+        raise RuntimeError("Use acquire(process_id) / release(process_id)")
@@ -1,26 +1,107 @@
+import threading
 import time
+from synchronization.fences import FENCES, memory_fence
+from synchronization.lock_stats import LockStats
+from utils import trace
 
 
 class DekkerLock:
+    parties = 2
+    # LockStats while instrumentation is on, see set_stats_enabled()
+    stats: LockStats | None = None
+
     def __init__(self):
         self.flag = [False, False]
         self.turn = 0
+        # private fence lock (free-threaded build), see synchronization.fences
+        self._fence = threading.Lock()
+
+    def set_stats_enabled(self, enabled: bool):
+        if not enabled:
+            self.stats = None
+        elif self.stats is None:
+            self.stats = LockStats()
 
     def acquire(self, process_id: int):
+        stats = self.stats
+        tracer = trace.ACTIVE
+        t0 = time.perf_counter_ns() if stats is not None or tracer is not None else 0
+        spins = yields = 0
         other = 1 - process_id
         self.flag[process_id] = True
+        if FENCES:
+            memory_fence(self._fence)
         while self.flag[other]:
+            spins += 1
             if self.turn == other:
                 self.flag[process_id] = False
+                yields += 1
                 # busy-wait with cooperative sleep to avoid locking CPU
                 while self.turn == other:
                     time.sleep(0.0005)
+                    spins += 1
                 self.flag[process_id] = True
+                if FENCES:
+                    memory_fence(self._fence)
+        if stats is not None:
+            stats.on_acquired(time.perf_counter_ns() - t0, spins > 0, spins, yields)
+        if tracer is not None:
+            tracer.record(trace.OP_LOCK_ACQUIRE, process_id, time.perf_counter_ns() - t0)
 
     def release(self, process_id: int):
+        stats = self.stats
+        if stats is not None:
+            stats.on_release()
+        tracer = trace.ACTIVE
+        if tracer is not None:
+            tracer.record(trace.OP_LOCK_RELEASE, process_id)
+        if FENCES:
+            memory_fence(self._fence)  # critical-section writes become visible first
         self.turn = 1 - process_id
         self.flag[process_id] = False
 
     # Context manager helpers
     def __enter__(self):
         raise RuntimeError("Use acquire(process_id) / release(process_id) with process id 0 or 1")
+
+
+class SharedDekkerLock(DekkerLock):
+    """
+    DekkerLock whose flag[0], flag[1] and turn live in three int64 slots of a
+    memoryview (e.g. over multiprocessing.shared_memory), so two processes can
+    use it. Without a GIL in common, a fence is needed after raising the flag.
+    """
+
+    def __init__(self, view: memoryview):
+        # attaching must not reset state the other process may already use
+        self.flag = view[0:2]
+        self._turn = view[2:3]
+
+    @property
+    def turn(self) -> int:
+        return self._turn[0]
+
+    @turn.setter
+    def turn(self, value: int):
+        self._turn[0] = value
+
+    def acquire(self, process_id: int):
+        other = 1 - process_id
+        self.flag[process_id] = True
+        memory_fence()
+        while self.flag[other]:
+            if self.turn == other:
+                self.flag[process_id] = False
+                while self.turn == other:
+                    time.sleep(0.0005)
+                self.flag[process_id] = True
+                memory_fence()
+
+    def release(self, process_id: int):
+        memory_fence()  # critical-section writes become visible first
+        self.turn = 1 - process_id
+        self.flag[process_id] = False
+
+    def detach(self):
+        self.flag.release()
+        self._turn.release()
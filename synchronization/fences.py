@@ -0,0 +1,30 @@
+import os
+import sys
+import threading
+
+# With the GIL, a thread switch is a full memory barrier, so the plain list
+# stores and loads of the software locks are sequentially consistent. The
+# free-threaded build (3.13t/3.14t) gives them at most acquire/release order:
+# a store to our own flag may still sit in the store buffer when we load the
+# other thread's flag, and both enter. The locks then need an explicit
+# store-load fence, which memory_fence below provides on x86-64 only; on
+# weakly ordered CPUs (aarch64) the software locks are not known to be
+# correct on the free-threaded build until benchmarks.stress passes there.
+# OS_LW_FENCES=1 forces fences on a GIL build (to measure their cost),
+# OS_LW_FENCES=0 turns them off (to demonstrate the race).
+FREE_THREADED = not getattr(sys, "_is_gil_enabled", lambda: True)()
+FENCES = {"1": True, "0": False}.get(os.environ.get("OS_LW_FENCES", ""), FREE_THREADED)
+
+_fence_lock = threading.Lock()
+
+
+def memory_fence(lock: threading.Lock = _fence_lock):
+    # An uncontended lock round trip is an atomic read-modify-write. On x86-64
+    # a locked RMW is a full barrier, so it orders the preceding store before
+    # the following load (store-load fence). On aarch64 the acquire/release
+    # pair does not: a store before the acquire may still pass a load after
+    # the release, so this is not a store-load fence there; Python exposes no
+    # sequentially consistent primitive to use instead.
+    # Pass a lock of your own to keep unrelated fences from contending.
+    with lock:
+        pass
@@ -0,0 +1,38 @@
+import threading
+import time
+from synchronization.fences import FENCES, memory_fence
+
+
+class FilterLock:
+    """Peterson's filter lock: N-1 waiting levels, one victim per level."""
+
+    def __init__(self, n: int):
+        if n < 1:
+            raise ValueError("n must be >= 1")
+        self.parties = n
+        self.level = [0] * n
+        self.victim = [0] * n
+        self._fence = threading.Lock()
+
+    def acquire(self, process_id: int):
+        for lvl in range(1, self.parties):
+            self.level[process_id] = lvl
+            self.victim[lvl] = process_id
+            if FENCES:
+                memory_fence(self._fence)
+            while self.victim[lvl] == process_id and self._someone_at(lvl, process_id):
+                time.sleep(0.0005)
+
+    def _someone_at(self, lvl: int, process_id: int) -> bool:
+        for k in range(self.parties):
+            if k != process_id and self.level[k] >= lvl:
+                return True
+        return False
+
+    def release(self, process_id: int):
+        if FENCES:
+            memory_fence(self._fence)
+        self.level[process_id] = 0
+
+    def __enter__(self):
+        raise RuntimeError("Use acquire(process_id) / release(process_id)")
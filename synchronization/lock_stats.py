@@ -0,0 +1,83 @@
+import time
+
+# wait/hold histogram: bucket k counts durations below 2**k microseconds
+_BUCKETS = 22
+
+
+def _bucket(ns: int) -> int:
+    return min(_BUCKETS - 1, (ns // 1000).bit_length())
+
+
+class LockStats:
+    """
+    Contention counters for one lock. Updated only by the thread that holds
+    the lock (right after acquiring and right before releasing), so the lock
+    itself protects them; snapshot() readers get a best-effort copy.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.acquisitions = 0
+        self.contended = 0
+        self.spins = 0
+        self.yields = 0
+        self.wait_total_ns = 0
+        self.wait_max_ns = 0
+        self.hold_total_ns = 0
+        self.hold_max_ns = 0
+        self.wait_histogram = [0] * _BUCKETS
+        self._held_since = 0
+
+    def on_acquired(self, wait_ns: int, contended: bool, spins: int = 0, yields: int = 0):
+        self.acquisitions += 1
+        if contended:
+            self.contended += 1
+        self.spins += spins
+        self.yields += yields
+        self.wait_total_ns += wait_ns
+        if wait_ns > self.wait_max_ns:
+            self.wait_max_ns = wait_ns
+        self.wait_histogram[_bucket(wait_ns)] += 1
+        self._held_since = time.perf_counter_ns()
+
+    def on_release(self):
+        if not self._held_since:
+            return  # enabled while the lock was already held
+        hold = time.perf_counter_ns() - self._held_since
+        self._held_since = 0
+        self.hold_total_ns += hold
+        if hold > self.hold_max_ns:
+            self.hold_max_ns = hold
+
+    def _wait_quantile_us(self, hist, total: int, q: float) -> float:
+        """Upper bound of the histogram bucket holding the q-quantile."""
+        if not total:
+            return 0.0
+        target = q * total
+        seen = 0
+        for k, n in enumerate(hist):
+            seen += n
+            if seen >= target:
+                return float(2 ** k)
+        return float(2 ** (len(hist) - 1))
+
+    def snapshot(self) -> dict:
+        hist = list(self.wait_histogram)
+        n = self.acquisitions
+        return {
+            "acquisitions": n,
+            "contended": self.contended,
+            "contention_ratio": self.contended / n if n else 0.0,
+            "spins": self.spins,
+            "yields": self.yields,
+            "wait_total_ms": self.wait_total_ns / 1e6,
+            "wait_max_us": self.wait_max_ns / 1e3,
+            "wait_p50_us": self._wait_quantile_us(hist, sum(hist), 0.50),
+            "wait_p99_us": self._wait_quantile_us(hist, sum(hist), 0.99),
+            "hold_total_ms": self.hold_total_ns / 1e6,
+            "hold_avg_us": self.hold_total_ns / n / 1e3 if n else 0.0,
+            "hold_max_us": self.hold_max_ns / 1e3,
+            "wait_histogram_us": {f"<{2 ** k}": c for k, c in enumerate(hist) if c},
+        }
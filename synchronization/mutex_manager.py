@@ -1,21 +1,55 @@
 import threading
+import time
+from synchronization.lock_stats import LockStats
+from utils import trace
 
 
 class SharedMutex:
     """Simple context-manager wrapper over threading.Lock to share between threads."""
 
+    # any number of threads may contend; process ids are accepted and ignored
+    # so it can stand in for the software locks in ThreadSafeBuffer
+    parties = None
+
     def __init__(self):
         self._lock = threading.Lock()
+        # LockStats while instrumentation is on, see set_stats_enabled()
+        self.stats: LockStats | None = None
+
+    def set_stats_enabled(self, enabled: bool):
+        if not enabled:
+            self.stats = None
+        elif self.stats is None:
+            self.stats = LockStats()
 
     def __enter__(self):
-        self._lock.acquire()
+        self.acquire()
 
     def __exit__(self, exc_type, exc, tb):
-        self._lock.release()
+        self.release()
 
     # Expose acquire/release for explicit use if needed
-    def acquire(self):
-        self._lock.acquire()
+    def acquire(self, process_id: int | None = None):
+        stats = self.stats
+        tracer = trace.ACTIVE
+        if stats is None and tracer is None:
+            self._lock.acquire()
+            return
+        t0 = time.perf_counter_ns()
+        contended = not self._lock.acquire(blocking=False)
+        if contended:
+            self._lock.acquire()
+        wait = time.perf_counter_ns() - t0
+        if stats is not None:
+            stats.on_acquired(wait, contended)
+        if tracer is not None:
+            tracer.record(trace.OP_MUTEX_ACQUIRE, -1 if process_id is None else process_id, wait)
 
-    def release(self):
+    def release(self, process_id: int | None = None):
+        stats = self.stats
+        if stats is not None:
+            stats.on_release()
+        tracer = trace.ACTIVE
+        if tracer is not None:
+            tracer.record(trace.OP_MUTEX_RELEASE, -1 if process_id is None else process_id)
         self._lock.release()
@@ -0,0 +1,39 @@
+from synchronization.dekker_algorithm import DekkerLock
+
+
+class TournamentLock:
+    """
+    Binary tree of two-party Dekker locks. Each process starts at its leaf and
+    wins one DekkerLock per level on the way to the root.
+    """
+
+    def __init__(self, n: int):
+        if n < 1:
+            raise ValueError("n must be >= 1")
+        self.parties = n
+        leaves = 2
+        while leaves < n:
+            leaves *= 2
+        self._leaves = leaves
+        # heap layout: node 1 is the root, node k has children 2k and 2k+1
+        self._nodes = [DekkerLock() for _ in range(leaves)]
+
+    def _path(self, process_id: int):
+        """(node, side) pairs from the leaf up to the root."""
+        node = self._leaves + process_id
+        path = []
+        while node > 1:
+            path.append((node // 2, node % 2))
+            node //= 2
+        return path
+
+    def acquire(self, process_id: int):
+        for node, side in self._path(process_id):
+            self._nodes[node].acquire(side)
+
+    def release(self, process_id: int):
+        for node, side in reversed(self._path(process_id)):
+            self._nodes[node].release(side)
+
+    def __enter__(self):
+        raise RuntimeError("Use acquire(process_id) / release(process_id)")
@@ -0,0 +1,92 @@
+import os
+import random
+import tempfile
+import unittest
+from utils.line_index import LineIndex
+
+
+class SmallBlockIndex(LineIndex):
+    # tiny blocks put many boundaries (and lines across them) in a small file
+    BLOCK = 16
+    CHUNK = 64
+
+
+class LineIndexTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".txt")
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def write(self, data: bytes, mode: str = "wb"):
+        with open(self.path, mode) as f:
+            f.write(data)
+
+    def check(self, index: LineIndex, data: bytes):
+        lines = data.decode().split("\n")
+        if lines[-1] == "":
+            lines.pop()
+        self.assertEqual(index.line_count, len(lines))
+        for start in range(len(lines) + 1):
+            self.assertEqual(index.read_lines(start, 3), lines[start:start + 3], f"start={start}")
+
+    def test_block_boundaries(self):
+        rng = random.Random(1)
+        for trailing_newline in (True, False):
+            for n in (0, 1, 15, 16, 17, 63, 64, 65, 200):
+                lines = [f"{i}:" + "x" * rng.randrange(0, 40) for i in range(n)]
+                data = "\n".join(lines).encode() + (b"\n" if trailing_newline and n else b"")
+                self.write(data)
+                for cls in (LineIndex, SmallBlockIndex):
+                    index = cls(self.path)
+                    index.update()
+                    self.check(index, data)
+
+    def test_lines_ending_on_boundaries(self):
+        # 15 chars + newline: every line ends exactly at a 16-byte boundary
+        data = b"".join(b"%015d\n" % i for i in range(10))
+        self.write(data)
+        index = SmallBlockIndex(self.path)
+        index.update()
+        self.check(index, data)
+        self.assertEqual(index.search("000000000000007"), 7)
+
+    def test_incremental_update(self):
+        index = SmallBlockIndex(self.path)
+        data = b""
+        for i in range(50):
+            piece = (b"line %d" % i) + (b"\n" if i % 3 else b"")
+            data += piece
+            self.write(piece, "ab")
+            index.update()
+            self.check(index, data)
+
+    def test_search_past_unterminated_last_line(self):
+        stride = 64
+        lines = ["x%d" % i for i in range(stride)]
+        self.write(("\n".join(lines)).encode())  # 63 newlines, last line unterminated
+        for cls in (LineIndex, SmallBlockIndex):
+            index = cls(self.path)
+            index.update()
+            self.assertEqual(index.line_count, stride)
+            self.assertEqual(index.search("x63", 63), 63)
+            self.assertIsNone(index.search("x", stride))
+            self.assertEqual(index.search("x", stride, backwards=True), stride - 1)
+            self.assertEqual(index.search("x1", 2), 10)
+            self.assertEqual(index.search("x1", 10, backwards=True), 1)
+
+    def test_truncated_after_update(self):
+        self.write(b"a\nb\nc\n")
+        index = LineIndex(self.path)
+        index.update()
+        self.write(b"")
+        self.assertEqual(index.read_lines(0, 3), [])
+        self.assertIsNone(index.search("a"))
+        self.write(b"z\n")
+        index.update()
+        self.assertEqual(index.read_lines(0, 3), ["z"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+import abc
+import asyncio
+import itertools
+import threading
+import time
+from utils.async_buffer import AsyncBuffer
+
+
+class AsyncEngine:
+    """An asyncio event loop running in its own daemon thread (off the Tk thread)."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def call(self, fn, *args):
+        """Run a plain callable on the loop thread."""
+        self.loop.call_soon_threadsafe(fn, *args)
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def close(self, timeout: float = 1.0):
+        if self.loop.is_closed():
+            return
+
+        async def _cancel_all():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            self.submit(_cancel_all()).result(timeout)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self.loop.close()
+
+
+class AsyncActor(abc.ABC):
+    """
+    Coroutine counterpart of BufferWorkerThread. Control state is plain
+    attributes plus asyncio events that only the loop thread touches; the
+    group below forwards control calls onto the loop.
+    """
+
+    def __init__(self, group: "AsyncActorGroup"):
+        self.group = group
+        self.buffer = group.buffer
+        self.count = 0
+
+    async def _wait_tick(self, next_tick: float) -> float:
+        """Periodic wait against a monotonic deadline, holding while paused."""
+        g = self.group
+        delay = g.delay
+        now = time.monotonic()
+        if now - next_tick > delay:
+            next_tick = now
+        next_tick += delay
+        remaining = next_tick - time.monotonic()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+        else:
+            await asyncio.sleep(0)  # let other actors run
+        if not g.running.is_set():
+            await g.running.wait()
+        return next_tick
+
+    @abc.abstractmethod
+    async def run(self):
+        """The actor's loop; runs until its task is cancelled."""
+
+
+class AsyncProducer(AsyncActor):
+    async def run(self):
+        counter = self.group.counter
+        next_tick = time.monotonic()
+        while True:
+            if not self.group.running.is_set():
+                await self.group.running.wait()
+            batch = self.group.batch_size
+            items = [next(counter) for _ in range(batch)]
+            stored = await self.buffer.put_many(items)
+            self.count += stored
+            next_tick = await self._wait_tick(next_tick)
+
+
+class AsyncConsumer(AsyncActor):
+    async def run(self):
+        g = self.group
+        next_tick = time.monotonic()
+        while True:
+            if not g.running.is_set():
+                await g.running.wait()
+            if not self.buffer.size():
+                # wait apart from the take, so a pause that lands meanwhile holds before it
+                await self.buffer.wait_items()
+                continue
+            items = await self.buffer.get_many(g.batch_size)
+            self.count += len(items)
+            next_tick = await self._wait_tick(next_tick)
+
+
+class AsyncActorGroup:
+    """
+    `size` coroutine actors of one kind on an AsyncEngine, controlled together
+    with the BaseControlledThread surface (start_safe/pause/resume/stop,
+    set_delay, set_batch_size, status, count) so the GUI can drive it like a
+    single thread.
+    """
+
+    def __init__(self, engine: AsyncEngine, actor_cls, buffer: AsyncBuffer, size: int = 1):
+        self.engine = engine
+        self.actor_cls = actor_cls
+        self.buffer = buffer
+        self.size = max(1, int(size))
+        self.delay = 0.3
+        self.batch_size = 1
+        self.counter = itertools.count(1)  # shared by producers: unique items
+        self.running = asyncio.Event()
+        self.actors: list[AsyncActor] = []
+        self._tasks: list[asyncio.Task] = []
+        self._count_done = 0
+        # Tk-side view: a start is posted (or done) and no stop followed it yet.
+        # _tasks only changes later on the loop thread, so it cannot guard start_safe.
+        self._started = False
+        self.status = "STOP"
+
+    @property
+    def count(self) -> int:
+        return self._count_done + sum(a.count for a in list(self.actors))
+
+    def is_alive(self) -> bool:
+        return self._started
+
+    def set_delay(self, delay: float):
+        self.delay = max(0.0, float(delay))
+
+    def set_batch_size(self, n: int):
+        self.batch_size = max(1, int(n))
+
+    def set_size(self, size: int):
+        """Takes effect on the next start."""
+        self.size = max(1, int(size))
+
+    def _start(self):
+        if self._tasks:
+            return
+        self.running.set()
+        self.actors = [self.actor_cls(self) for _ in range(self.size)]
+        self._tasks = [self.engine.loop.create_task(a.run()) for a in self.actors]
+
+    def _stop(self):
+        for t in self._tasks:
+            t.cancel()
+        self._count_done += sum(a.count for a in self.actors)
+        self.actors = []
+        self._tasks = []
+
+    def start_safe(self):
+        if self.is_alive():
+            self.resume()
+            return
+        self._started = True
+        self.status = "RUNNING"
+        self.engine.call(self._start)
+
+    def pause(self):
+        self.status = "PAUSED"
+        self.engine.call(self.running.clear)
+
+    def resume(self):
+        if self.is_alive():
+            self.status = "RUNNING"
+        self.engine.call(self.running.set)
+
+    def stop(self):
+        self._started = False
+        self.status = "STOP"
+        self.engine.call(self._stop)
@@ -0,0 +1,111 @@
+import threading
+import time
+
+
+class BaseControlledThread:
+    """
+    Start/pause/resume/stop control shared by the worker threads.
+
+    Waiting is event driven: a paused thread sleeps on a condition until
+    resume/stop, and delays are waited out against time.monotonic() deadlines,
+    so stop and pause take effect immediately and sub-millisecond delays work.
+    """
+
+    default_delay = 0.5
+
+    def __init__(self):
+        self._thread: threading.Thread | None = None
+        self._pause_event = threading.Event()
+        self._pause_event.set()  # not paused
+        self._stop_event = threading.Event()
+        self._wakeup = threading.Condition()
+        self._delay = self.default_delay
+        self._next_tick: float | None = None
+        self.status = "STOP"
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def set_delay(self, delay: float):
+        self._delay = max(0.0, float(delay))
+
+    def _signal(self):
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def pause(self):
+        self._pause_event.clear()
+        self.status = "PAUSED"
+        self._signal()
+
+    def resume(self):
+        self._pause_event.set()
+        if not self._stop_event.is_set():
+            self.status = "RUNNING"
+        self._signal()
+
+    def stop(self):
+        self._stop_event.set()
+        self._pause_event.set()
+        self.status = "STOP"
+        self._signal()
+
+    def start_safe(self):
+        if self.is_alive():
+            self.resume()
+            return
+
+        self._stop_event.clear()
+        self._pause_event.set()
+        self._next_tick = None
+        self.status = "RUNNING"
+
+        self._thread = threading.Thread(target=self._thread_entry, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: float | None = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _thread_entry(self):
+        try:
+            self.run()
+        finally:
+            self.status = "STOP"
+
+    def _sleep_until(self, deadline: float) -> bool:
+        """Block until the monotonic deadline, holding while paused. True on stop."""
+        with self._wakeup:
+            while not self._stop_event.is_set():
+                if not self._pause_event.is_set():
+                    self._wakeup.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._wakeup.wait(remaining)
+            return True
+
+    def _wait_paused(self) -> bool:
+        """Hold while paused, before taking or making the next item. True on stop."""
+        with self._wakeup:
+            while not self._stop_event.is_set() and not self._pause_event.is_set():
+                self._wakeup.wait()
+            return self._stop_event.is_set()
+
+    def _wait_or_stop(self, duration: float) -> bool:
+        """Wait `duration` seconds from now. True on stop."""
+        return self._sleep_until(time.monotonic() + duration)
+
+    def _wait_tick(self) -> bool:
+        """
+        Wait for the next periodic tick, `delay` after the previous tick rather
+        than after now, so time spent working does not accumulate as drift.
+        After falling a whole period behind (e.g. a pause) the schedule
+        restarts from now instead of bursting to catch up. True on stop.
+        """
+        now = time.monotonic()
+        if self._next_tick is None or now - self._next_tick > self._delay:
+            self._next_tick = now
+        self._next_tick += self._delay
+        return self._sleep_until(self._next_tick)
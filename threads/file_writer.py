@@ -1,77 +1,41 @@
-import threading
 import time
 import queue
 from datetime import datetime
 from synchronization.mutex_manager import SharedMutex
-from utils.file_manager import append_line_safe
-
-
-class BaseControlledThread:
-    def __init__(self):
-        self._thread: threading.Thread | None = None
-        self._pause_event = threading.Event()
-        self._pause_event.set()  # not paused
-        self._stop_event = threading.Event()
-        self._delay = 0.5
-        self.status = "STOP"
-
-    def is_alive(self) -> bool:
-        return self._thread is not None and self._thread.is_alive()
-
-    def set_delay(self, delay: float):
-        self._delay = max(0.0, float(delay))
-
-    def pause(self):
-        self._pause_event.clear()
-        self.status = "PAUSED"
-
-    def resume(self):
-        self._pause_event.set()
-        if not self._stop_event.is_set():
-            self.status = "RUNNING"
-
-    def stop(self):
-        self._stop_event.set()
-        self._pause_event.set()
-        self.status = "STOP"
-
-    def start_safe(self):
-        if self.is_alive():
-            self.resume()
-            return
-
-        self._stop_event.clear()
-        self._pause_event.set()
-        self.status = "RUNNING"
-
-        self._thread = threading.Thread(target=self._thread_entry, daemon=True)
-        self._thread.start()
-
-    def _thread_entry(self):
-        try:
-            self.run()
-        finally:
-            self.status = "STOP"
-
-    def _wait_or_stop(self, duration: float):
-        end = time.time() + duration
-        while time.time() < end:
-            if self._stop_event.is_set():
-                return True
-            while not self._pause_event.is_set():
-                if self._stop_event.is_set():
-                    return True
-                time.sleep(0.02)
-            time.sleep(0.02)
-        return self._stop_event.is_set()
+from utils.file_manager import FileAppender
+from threads.base import BaseControlledThread
+from utils import trace
 
 
 class FileWriterThread(BaseControlledThread):
-    def __init__(self, input_queue: "queue.Queue[str]", file_path: str, mutex: SharedMutex):
+    def __init__(self, input_queue: "queue.Queue[str]", appender: FileAppender, mutex: SharedMutex):
         super().__init__()
         self._q = input_queue
-        self._file = file_path
+        self._appender = appender
         self._mutex = mutex
+        # throughput mode: > 1 drains up to this many bytes per critical section
+        self._batch_bytes = 1
+        # lines appended so far; written only by the worker thread
+        self.count = 0
+        self._batch_time = 0.05
+
+    def set_batch_bytes(self, n: int):
+        self._batch_bytes = max(1, int(n))
+
+    def _drain(self, first: str) -> str:
+        """Collect queued chars after `first`, within the byte and time budget."""
+        chunk = [first]
+        size = len(first.encode("utf-8"))
+        deadline = time.monotonic() + self._batch_time
+        while size < self._batch_bytes and time.monotonic() < deadline:
+            try:
+                ch = self._q.get_nowait()
+            except queue.Empty:
+                break
+            chunk.append(ch)
+            size += len(ch.encode("utf-8"))
+        # same layout as per-char mode: one line per char
+        return "".join(ch if ch.endswith("\n") else ch + "\n" for ch in chunk)
 
     def run(self):
         while not self._stop_event.is_set():
@@ -81,23 +45,42 @@ class FileWriterThread(BaseControlledThread):
                 if self._wait_or_stop(self._delay):
                     break
                 continue
-            # critical section: append char
-            with self._mutex:
-                append_line_safe(self._file, ch)
+            t0 = trace.clock()
+            if self._batch_bytes > 1:
+                # critical section: append the whole batch, delay once per batch
+                text = self._drain(ch)
+                with self._mutex:
+                    self._appender.append_text(text)
+            else:
+                # critical section: append char; a queued "\n" is a line of its own, as in _drain
+                text = ch if ch.endswith("\n") else ch + "\n"
+                with self._mutex:
+                    self._appender.append_text(text)
+            lines = text.count("\n")
+            self.count += lines
+            tracer = trace.ACTIVE
+            if tracer is not None:
+                tracer.record(trace.OP_WRITE, len(text), trace.clock() - t0, lines)
             if self._wait_or_stop(self._delay):
                 break
 
 
 class TimeWriterThread(BaseControlledThread):
-    def __init__(self, file_path: str, mutex: SharedMutex):
+    def __init__(self, appender: FileAppender, mutex: SharedMutex):
         super().__init__()
-        self._file = file_path
+        self._appender = appender
         self._mutex = mutex
+        self.count = 0
 
     def run(self):
         while not self._stop_event.is_set():
             now = datetime.now().strftime("%H:%M:%S")
+            t0 = trace.clock()
             with self._mutex:
-                append_line_safe(self._file, now)
-            if self._wait_or_stop(self._delay):
+                self._appender.append_line(now)
+            self.count += 1
+            tracer = trace.ACTIVE
+            if tracer is not None:
+                tracer.record(trace.OP_WRITE, len(now) + 1, trace.clock() - t0)
+            if self._wait_tick():
                 break
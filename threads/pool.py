@@ -0,0 +1,140 @@
+import time
+
+
+class WorkerPool:
+    """
+    N interchangeable workers (threads or processes) behind the single-worker
+    control surface, so the GUI drives a pool like one ConsumerThread.
+
+    `factory()` builds one worker with the BaseControlledThread surface.
+    The pool can be resized while running; surplus workers are stopped and kept
+    as retired until they exit, so their last batch still counts and their
+    process ids are not handed out twice. `limit` caps the pool (e.g. the free
+    parties of the buffer's lock).
+    """
+
+    def __init__(self, factory, size: int = 1, limit: int | None = None):
+        self._factory = factory
+        self.limit = limit
+        self._size = self._clamp(size)
+        self._delay = None
+        self._batch_size = 1
+        self.workers = []
+        self._retired = []
+        self._count_done = 0
+        self._status = "STOP"
+
+    def _clamp(self, n: int) -> int:
+        n = max(1, int(n))
+        return n if self.limit is None else min(n, self.limit)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def status(self) -> str:
+        if self._status == "STOP" and any(w.is_alive() for w in self.workers):
+            return "DRAINING"
+        return self._status
+
+    @property
+    def count(self) -> int:
+        self._prune()
+        return self._count_done + sum(w.count for w in self.workers + self._retired)
+
+    def _prune(self):
+        """Fold the counts of retired workers that have exited."""
+        alive = []
+        for w in self._retired:
+            if w.is_alive():
+                alive.append(w)
+            else:
+                self._count_done += w.count
+        self._retired = alive
+
+    def worker_stats(self) -> list[dict]:
+        return [{"index": i, "status": w.status, "count": w.count} for i, w in enumerate(self.workers)]
+
+    def is_alive(self) -> bool:
+        return any(w.is_alive() for w in self.workers)
+
+    def _spawn(self):
+        w = self._factory()
+        if self._delay is not None:
+            w.set_delay(self._delay)
+        w.set_batch_size(self._batch_size)
+        self.workers.append(w)
+        return w
+
+    def set_delay(self, delay: float):
+        self._delay = delay
+        for w in self.workers:
+            w.set_delay(delay)
+
+    def set_batch_size(self, n: int):
+        self._batch_size = n
+        for w in self.workers:
+            w.set_batch_size(n)
+
+    def resize(self, n: int) -> int:
+        """Grow or shrink to `n` workers (clamped to `limit`); applied live when running."""
+        self._prune()
+        n = self._clamp(n)
+        if self.limit is not None:
+            # retired workers still hold their process ids until they exit
+            n = max(1, min(n, self.limit - len(self._retired)))
+        self._size = n
+        running = self._status != "STOP"
+        while len(self.workers) > n:
+            w = self.workers.pop()
+            w.stop()
+            self._retired.append(w)
+        while running and len(self.workers) < n:
+            w = self._spawn()
+            w.start_safe()
+            if self._status == "PAUSED":
+                w.pause()
+        return n
+
+    def start_safe(self):
+        self._prune()
+        # drop workers that have exited, keeping their counts
+        for w in [w for w in self.workers if not w.is_alive()]:
+            self.workers.remove(w)
+            self._count_done += w.count
+        self._status = "RUNNING"
+        for w in self.workers:
+            w.start_safe()
+        self.resize(self._size)
+
+    def pause(self):
+        if self._status == "STOP":
+            return
+        self._status = "PAUSED"
+        for w in self.workers:
+            w.pause()
+
+    def resume(self):
+        if self._status == "STOP":
+            return
+        self._status = "RUNNING"
+        for w in self.workers:
+            w.resume()
+
+    def stop(self, drain: float = 1.0):
+        """
+        Stop every worker. Workers that support it first drain what is left
+        in the buffer for up to `drain` seconds.
+        """
+        self._status = "STOP"
+        for w in self.workers:
+            if drain and hasattr(w, "drain"):
+                w.drain(drain)
+            else:
+                w.stop()
+
+    def join(self, timeout: float | None = None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for w in self.workers + self._retired:
+            w.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
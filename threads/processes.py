@@ -0,0 +1,136 @@
+import itertools
+import multiprocessing as mp
+from utils.shm_buffer import SharedRingBuffer
+
+PRODUCER_ID = 0
+CONSUMER_ID = 1
+
+
+def _wait_paused(stop, pause) -> bool:
+    """Hold while paused. Returns True on stop."""
+    while not pause.is_set():
+        if stop.wait(0.05):
+            return True
+    return stop.is_set()
+
+
+def _wait(delay, stop, pause) -> bool:
+    """Sleep `delay` seconds, holding while paused. Returns True on stop."""
+    if stop.wait(delay.value):
+        return True
+    return _wait_paused(stop, pause)
+
+
+def _producer_main(buffer_name: str, stop, pause, delay, batch, count):
+    buffer = SharedRingBuffer(name=buffer_name)
+    counter = itertools.count(count.value + 1)
+    try:
+        while not stop.is_set():
+            items = [next(counter) for _ in range(max(1, batch.value))]
+            stored = 0
+            while stored < len(items) and not stop.is_set():
+                stored += buffer.put_many(items[stored:], PRODUCER_ID, timeout=0.2)
+            count.value += stored
+            if _wait(delay, stop, pause):
+                break
+    finally:
+        buffer.close()
+
+
+def _consumer_main(buffer_name: str, stop, pause, delay, batch, count):
+    buffer = SharedRingBuffer(name=buffer_name)
+    try:
+        while not stop.is_set():
+            # an empty poll skips _wait, so a pause must hold here
+            if _wait_paused(stop, pause):
+                break
+            items = buffer.get_many(max(1, batch.value), CONSUMER_ID, block=True, timeout=0.2)
+            if not items:
+                continue
+            count.value += len(items)
+            if _wait(delay, stop, pause):
+                break
+    finally:
+        buffer.close()
+
+
+class BaseControlledProcess:
+    """
+    Process counterpart of BaseControlledThread: same start_safe/pause/resume/
+    stop/set_delay/set_batch_size surface, with control state in shared values.
+    Callbacks cannot cross the process boundary, so progress is exposed as
+    the `count` of items moved instead.
+    """
+
+    target = None
+
+    def __init__(self, buffer: SharedRingBuffer):
+        self.buffer = buffer
+        self._process: mp.Process | None = None
+        self._pause_event = mp.Event()
+        self._pause_event.set()
+        self._stop_event = mp.Event()
+        self._delay = mp.Value("d", 0.3, lock=False)
+        self._batch_size = mp.Value("i", 1, lock=False)
+        self._count = mp.Value("q", 0, lock=False)
+        self._status = "STOP"
+
+    @property
+    def status(self) -> str:
+        return self._status if self.is_alive() else "STOP"
+
+    @property
+    def count(self) -> int:
+        return self._count.value
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def set_delay(self, delay: float):
+        self._delay.value = max(0.0, float(delay))
+
+    def set_batch_size(self, n: int):
+        self._batch_size.value = max(1, int(n))
+
+    def pause(self):
+        self._pause_event.clear()
+        self._status = "PAUSED"
+
+    def resume(self):
+        self._pause_event.set()
+        if not self._stop_event.is_set():
+            self._status = "RUNNING"
+
+    def stop(self):
+        self._stop_event.set()
+        self._pause_event.set()
+        self._status = "STOP"
+
+    def start_safe(self):
+        if self.is_alive():
+            self.resume()
+            return
+
+        self._stop_event.clear()
+        self._pause_event.set()
+        self._status = "RUNNING"
+
+        self._process = mp.Process(
+            target=type(self).target,
+            args=(self.buffer.name, self._stop_event, self._pause_event,
+                  self._delay, self._batch_size, self._count),
+            daemon=True,
+        )
+        self._process.start()
+
+    def join(self, timeout: float | None = None):
+        if self._process is not None:
+            self._process.join(timeout)
+
+
+class ProducerProcess(BaseControlledProcess):
+    target = staticmethod(_producer_main)
+
+
+class ConsumerProcess(BaseControlledProcess):
+    target = staticmethod(_consumer_main)
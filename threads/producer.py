@@ -1,70 +1,36 @@
-import threading
-import time
 import itertools
+import time
 from utils.buffer import ThreadSafeBuffer
+from threads.base import BaseControlledThread
 
 
-class BaseControlledThread:
-    def __init__(self):
-        self._thread: threading.Thread | None = None
-        self._pause_event = threading.Event()
-        self._pause_event.set()
-        self._stop_event = threading.Event()
-        self._delay = 0.3
-        self.status = "STOP"
-
-    def is_alive(self) -> bool:
-        return self._thread is not None and self._thread.is_alive()
-
-    def set_delay(self, delay: float):
-        self._delay = max(0.0, float(delay))
+class BufferWorkerThread(BaseControlledThread):
+    """Batch and callback handling shared by the producer and the consumer."""
 
-    def pause(self):
-        self._pause_event.clear()
-        self.status = "PAUSED"
+    default_delay = 0.3
 
-    def resume(self):
-        self._pause_event.set()
-        if not self._stop_event.is_set():
-            self.status = "RUNNING"
+    def __init__(self):
+        super().__init__()
+        self._batch_size = 1
+        # items moved so far; written only by the worker thread, read by the GUI
+        self.count = 0
 
-    def stop(self):
-        self._stop_event.set()
-        self._pause_event.set()
-        self.status = "STOP"
+    def set_batch_size(self, n: int):
+        # items moved per critical section (and per delay tick)
+        self._batch_size = max(1, int(n))
 
-    def start_safe(self):
-        if self.is_alive():
-            self.resume()
+    def _record(self, items, callback):
+        self.count += len(items)
+        if not callback:
             return
+        for item in items:
+            try:
+                callback(item)
+            except Exception:
+                pass
 
-        self._stop_event.clear()
-        self._pause_event.set()
-        self.status = "RUNNING"
 
-        self._thread = threading.Thread(target=self._thread_entry, daemon=True)
-        self._thread.start()
-
-    def _thread_entry(self):
-        try:
-            self.run()
-        finally:
-            self.status = "STOP"
-
-    def _cooperative_wait(self):
-        end = time.time() + self._delay
-        while time.time() < end:
-            if self._stop_event.is_set():
-                return True
-            while not self._pause_event.is_set():
-                if self._stop_event.is_set():
-                    return True
-                time.sleep(0.02)
-            time.sleep(0.02)
-        return False
-
-
-class ProducerThread(BaseControlledThread):
+class ProducerThread(BufferWorkerThread):
     def __init__(self, buffer: ThreadSafeBuffer, on_produced=None):
         super().__init__()
         self.buffer = buffer
@@ -72,31 +38,94 @@ class ProducerThread(BaseControlledThread):
         self._counter = itertools.count(1)
 
     def run(self):
-        while not self._stop_event.is_set():
-            item = next(self._counter)
-            self.buffer.put(item, process_id=0)
-            if self.on_produced:
-                try:
-                    self.on_produced(item)
-                except Exception:
-                    pass
-            if self._cooperative_wait():
-                break
+        pid = self.buffer.register()
+        try:
+            while not self._stop_event.is_set():
+                if self._wait_paused():
+                    break
+                if getattr(self.buffer, "throttled", False):
+                    # above the high watermark: hold off until consumers drain to the low one
+                    if self._wait_or_stop(max(self._delay, 0.01)):
+                        break
+                    continue
+                batch = self._batch_size
+                lossy = getattr(self.buffer, "lossy", False)
+                if lossy:
+                    # the overflow policy bounds the put; lost items are counted by the buffer
+                    items = [next(self._counter) for _ in range(batch)]
+                    stored = self.buffer.put_many(items, process_id=pid)
+                    self._record(items[:stored], self.on_produced)
+                elif batch == 1:
+                    items = [next(self._counter)]
+                    # park until there is room, re-checking stop between timeouts
+                    while not self.buffer.put(items[0], process_id=pid, timeout=0.2):
+                        if self._stop_event.is_set():
+                            return
+                else:
+                    items = [next(self._counter) for _ in range(batch)]
+                    stored = 0
+                    while stored < batch:
+                        stored += self.buffer.put_many(items[stored:], process_id=pid, timeout=0.2)
+                        if stored < batch and self._stop_event.is_set():
+                            self._record(items[:stored], self.on_produced)
+                            return
+                if not lossy:
+                    self._record(items, self.on_produced)
+                if self._wait_tick():
+                    break
+        finally:
+            self.buffer.unregister()
 
 
-class ConsumerThread(BaseControlledThread):
+class ConsumerThread(BufferWorkerThread):
     def __init__(self, buffer: ThreadSafeBuffer, on_consumed=None):
         super().__init__()
         self.buffer = buffer
         self.on_consumed = on_consumed
+        self._drain_deadline: float | None = None
+
+    def drain(self, timeout: float = 1.0):
+        """Stop once the buffer is empty (or after `timeout`), without delays in between."""
+        if not self.is_alive():
+            self.stop()
+            return
+        # status first: the thread sets STOP on exit, which may follow right after the deadline
+        self.status = "DRAINING"
+        self._drain_deadline = time.monotonic() + timeout
+        self._pause_event.set()
+        self._signal()
+        if not self.is_alive():  # exited before the status was set
+            self.status = "STOP"
+
+    def start_safe(self):
+        if not self.is_alive():
+            self._drain_deadline = None
+        super().start_safe()
 
     def run(self):
-        while not self._stop_event.is_set():
-            item = self.buffer.get(process_id=1)
-            if item is not None and self.on_consumed:
-                try:
-                    self.on_consumed(item)
-                except Exception:
-                    pass
-            if self._cooperative_wait():
-                break
+        pid = self.buffer.register()
+        try:
+            while not self._stop_event.is_set():
+                # an empty poll below skips _wait_tick, so a pause must hold here
+                if self._wait_paused():
+                    break
+                batch = self._batch_size
+                draining = self._drain_deadline is not None
+                timeout = 0.01 if draining else 0.2
+                if batch == 1:
+                    item = self.buffer.get(process_id=pid, block=True, timeout=timeout)
+                    items = [] if item is None else [item]
+                else:
+                    items = self.buffer.get_many(batch, process_id=pid, block=True, timeout=timeout)
+                if items:
+                    self._record(items, self.on_consumed)
+                if draining:
+                    if not items or time.monotonic() >= self._drain_deadline:
+                        break
+                    continue
+                if not items:
+                    continue
+                if self._wait_tick():
+                    break
+        finally:
+            self.buffer.unregister()
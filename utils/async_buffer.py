@@ -0,0 +1,139 @@
+import asyncio
+import itertools
+import sys
+import time
+from collections import deque
+from typing import Deque, Iterable, List, Optional, Tuple
+
+
+class AsyncBuffer:
+    """
+    Bounded FIFO buffer for coroutines, with ThreadSafeBuffer's semantics:
+    put waits for free space, get waits for an item, both with an optional
+    timeout, and put_many/get_many move a batch per call.
+
+    put/get must run on the buffer's event loop (one thread), so no lock is
+    needed; waiting actors are parked on futures and woken one per freed slot
+    or new item. size/tail/snapshot/memory_usage may be called from other
+    threads (the GUI); tail() retries on a seqlock-style version counter
+    rather than taking a lock the event loop would have to wait on.
+    """
+
+    def __init__(self, max_size: int = 100):
+        self._q: Deque[object] = deque()
+        self._max_size = max_size
+        self._getters: Deque[asyncio.Future] = deque()
+        self._putters: Deque[asyncio.Future] = deque()
+        self._appended = 0
+        self._version = 0
+
+    @staticmethod
+    def _wake(waiters: Deque[asyncio.Future], n: int = 1):
+        while waiters and n > 0:
+            fut = waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                n -= 1
+
+    async def _park(self, waiters: Deque[asyncio.Future], deadline: Optional[float]) -> bool:
+        """Wait to be woken; False when the deadline passed first."""
+        fut = asyncio.get_running_loop().create_future()
+        waiters.append(fut)
+        try:
+            if deadline is None:
+                await fut
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                await asyncio.wait_for(fut, remaining)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            if not fut.done():
+                fut.cancel()
+            try:
+                waiters.remove(fut)
+            except ValueError:
+                pass
+
+    def _append(self, items: List[object]):
+        self._version += 1
+        self._q.extend(items)
+        self._appended += len(items)
+        self._version += 1
+        self._wake(self._getters, len(items))
+
+    def _pop(self, n: int) -> List[object]:
+        self._version += 1
+        out = [self._q.popleft() for _ in range(n)]
+        self._version += 1
+        self._wake(self._putters, n)
+        return out
+
+    async def put(self, item, timeout: Optional[float] = None) -> bool:
+        return await self.put_many([item], timeout) == 1
+
+    async def put_many(self, items: Iterable[object], timeout: Optional[float] = None) -> int:
+        pending = list(items)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = 0
+        while done < len(pending):
+            n = min(len(pending) - done, self._max_size - len(self._q))
+            if n > 0:
+                self._append(pending[done:done + n])
+                done += n
+                continue
+            if not await self._park(self._putters, deadline):
+                break
+        return done
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[object]:
+        out = await self.get_many(1, timeout)
+        return out[0] if out else None
+
+    async def wait_items(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the buffer is not empty, without taking anything; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._q:
+            if not await self._park(self._getters, deadline):
+                return False
+        return True
+
+    async def get_many(self, max_n: int, timeout: Optional[float] = None) -> List[object]:
+        if not await self.wait_items(timeout):
+            return []
+        return self._pop(min(max_n, len(self._q)))
+
+    def size(self) -> int:
+        return len(self._q)
+
+    def snapshot(self) -> Iterable[object]:
+        # no lock: used only for UI best-effort snapshot
+        return list(self._q)
+
+    def tail(self, n: int) -> List[Tuple[int, object]]:
+        """The newest n items as (seq, item); safe to call from another thread."""
+        for _ in range(100):
+            version = self._version
+            if version % 2:
+                time.sleep(0)
+                continue
+            appended = self._appended
+            try:
+                items = list(itertools.islice(reversed(self._q), n))
+            except RuntimeError:  # deque mutated during iteration
+                continue
+            if self._version == version:
+                items.reverse()
+                return list(zip(range(appended - len(items), appended), items))
+        return []
+
+    def memory_usage(self) -> int:
+        items = self.snapshot()
+        return sys.getsizeof(self._q) + sum(sys.getsizeof(it) for it in items)
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
@@ -1,51 +1,490 @@
+import heapq
+import itertools
+import sys
+import threading
+import time
 from collections import deque
-from typing import Deque, Iterable, Optional
+from typing import Deque, Iterable, List, Optional, Tuple
 from synchronization.dekker_algorithm import DekkerLock
+from synchronization.rw_lock import ReaderWriterLock
+from utils import trace
+
+# what put does when the buffer is full
+BLOCK = "block"              # wait for space (optionally at most `timeout`, then reject)
+REJECT = "reject"            # refuse the new items at once
+DROP_OLDEST = "drop_oldest"  # evict the oldest items to make room
+DROP_NEWEST = "drop_newest"  # discard the new items that do not fit
+OVERFLOW_POLICIES = (BLOCK, REJECT, DROP_OLDEST, DROP_NEWEST)
+
+
+class ProcessIdPool:
+    """Hands out process ids 0..parties-1 (unbounded if parties is None), one per thread."""
+
+    def __init__(self, parties: Optional[int]):
+        self.parties = parties
+        # id allocation happens once per thread, outside the algorithm itself
+        self._lock = threading.Lock()
+        self._free: List[int] = []
+        self._next = 0
+        self._local = threading.local()
+
+    def register(self) -> int:
+        """Bind a free process id to the calling thread and return it."""
+        pid = getattr(self._local, "pid", None)
+        if pid is not None:
+            return pid
+        with self._lock:
+            if self._free:
+                pid = heapq.heappop(self._free)
+            elif self.parties is None or self._next < self.parties:
+                pid = self._next
+                self._next += 1
+            else:
+                raise RuntimeError(f"All {self.parties} process ids of the buffer are in use")
+        self._local.pid = pid
+        return pid
+
+    def unregister(self):
+        """Return the calling thread's process id to the pool."""
+        pid = getattr(self._local, "pid", None)
+        if pid is None:
+            return
+        self._local.pid = None
+        with self._lock:
+            heapq.heappush(self._free, pid)
 
 
 class ThreadSafeBuffer:
     """
-    Unbounded buffer implemented via deque. For demonstration, we expose max_size
-    to drive UI progress, but we don't block producer at max; we cap listbox view only.
+    Bounded FIFO buffer implemented via deque; max_size also drives UI progress.
+
+    Synchronization is done with a software lock taking acquire(process_id) /
+    release(process_id): Dekker's algorithm by default (two threads), any
+    N-party lock (BakeryLock, FilterLock, TournamentLock) with `parties` slots,
+    or SharedMutex (parties=None, unlimited). Process ids are handed out per
+    thread via register()/unregister().
 
-    Synchronization is done with Dekker's algorithm between two threads only:
-    process_id 0 -> producer, process_id 1 -> consumer.
+    Blocking put/get park the caller on a condition variable that is signalled
+    right after the opposite operation leaves the critical section, so waiting
+    threads neither poll nor sleep.
+
+    What a put into a full buffer does is the overflow policy (see
+    set_overflow); items lost to it are counted in `dropped`/`rejected`.
+    Optional high/low watermarks (set_watermarks) raise `throttled` early so
+    producers can slow down before the buffer is full.
+
+    Observers that are not lock parties (the GUI, metrics) read size/snapshot/
+    tail under a writer-preferring ReaderWriterLock whose write side wraps only
+    the deque mutation itself.
     """
 
-    def __init__(self, max_size: int = 100):
+    def __init__(self, max_size: int = 100, lock=None, overflow: str = BLOCK,
+                 overflow_timeout: Optional[float] = None):
         self._q: Deque[object] = deque()
-        self._dekker = DekkerLock()
+        self._lock = lock if lock is not None else DekkerLock()
         self._max_size = max_size
+        self._ids = ProcessIdPool(getattr(self._lock, "parties", None))
+        # wakeups only; mutual exclusion of the deque stays with self._lock
+        self._signal = threading.Lock()
+        self._not_empty = threading.Condition(self._signal)
+        self._not_full = threading.Condition(self._signal)
+        self._put_seq = 0
+        self._get_seq = 0
+        self._appended = 0  # puts since creation: the seq numbers tail() reports
+        # observers (size/snapshot/tail) read under this lock's shared side;
+        # mutations, already serialized by self._lock, take its write side
+        self._rw = ReaderWriterLock()
+        self._overflow = BLOCK
+        self._overflow_timeout: Optional[float] = None
+        self.set_overflow(overflow, overflow_timeout)
+        # items lost to the overflow policy; updated under self._signal
+        self.dropped = 0
+        self.rejected = 0
+        self._high: Optional[int] = None
+        self._low = 0
+        self._on_high = None
+        self._on_low = None
+        self.throttled = False
 
-    def put(self, item, process_id: int):
-        # Wait while full; use Dekker for mutual exclusion of check+append
-        while True:
-            self._dekker.acquire(process_id)
+    @property
+    def parties(self) -> Optional[int]:
+        return self._ids.parties
+
+    @property
+    def lock(self):
+        return self._lock
+
+    @property
+    def overflow(self) -> str:
+        return self._overflow
+
+    @property
+    def lossy(self) -> bool:
+        """True when a put into a full buffer may give up instead of waiting for space."""
+        return self._overflow != BLOCK or self._overflow_timeout is not None
+
+    def set_overflow(self, policy: str, timeout: Optional[float] = None):
+        """
+        Full-buffer policy: BLOCK (wait; with `timeout`, reject after that many
+        seconds when the caller gives no timeout of its own), REJECT,
+        DROP_OLDEST or DROP_NEWEST.
+        """
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"unknown overflow policy: {policy!r}")
+        self._overflow = policy
+        self._overflow_timeout = timeout if policy == BLOCK else None
+
+    def set_watermarks(self, high: Optional[int], low: Optional[int] = None, on_high=None, on_low=None):
+        """
+        Set `throttled` and call on_high(size) once the size reaches `high`,
+        then clear it and call on_low(size) once it falls back to `low`
+        (default: half of high). high=None turns watermarks off. Callbacks run
+        in the producer/consumer thread that crossed the mark, outside the lock.
+        """
+        self._on_high = on_high
+        self._on_low = on_low
+        self._low = (high // 2 if low is None else low) if high is not None else 0
+        self._high = high
+        if high is None:
+            self.throttled = False
+
+    def overflow_stats(self) -> dict:
+        return {"policy": self._overflow, "dropped": self.dropped, "rejected": self.rejected,
+                "throttled": self.throttled}
+
+    def _count_lost(self, dropped: int = 0, rejected: int = 0):
+        with self._signal:
+            self.dropped += dropped
+            self.rejected += rejected
+
+    def _watermark(self, size: int):
+        """Called inside the critical section; returns the callback of a crossed mark."""
+        if self._high is None:
+            return None
+        if not self.throttled and size >= self._high:
+            self.throttled = True
+            return self._on_high
+        if self.throttled and size <= self._low:
+            self.throttled = False
+            return self._on_low
+        return None
+
+    @staticmethod
+    def _notify_mark(callback, size: int):
+        if callback is not None:
             try:
-                if len(self._q) < self._max_size:
-                    self._q.append(item)
-                    return
-            finally:
-                self._dekker.release(process_id)
-            # cooperative backoff outside CS
-            import time as _t
-            _t.sleep(0.002)
-
-    def get(self, process_id: int) -> Optional[object]:
-        self._dekker.acquire(process_id)
+                callback(size)
+            except Exception:
+                pass
+
+    def register(self) -> int:
+        return self._ids.register()
+
+    def unregister(self):
+        self._ids.unregister()
+
+    def _pid(self, process_id: Optional[int]) -> int:
+        return self._ids.register() if process_id is None else process_id
+
+    def _try_put(self, item, pid: int) -> bool:
+        self._lock.acquire(pid)
         try:
-            if self._q:
-                return self._q.popleft()
-            return None
+            if len(self._q) >= self._max_size:
+                return False
+            self._rw.acquire_write()
+            self._q.append(item)
+            self._appended += 1
+            self._rw.release_write()
+            size = len(self._q)
+            mark = self._watermark(size)
+        finally:
+            self._lock.release(pid)
+        with self._signal:
+            self._put_seq += 1
+            self._not_empty.notify()
+        self._notify_mark(mark, size)
+        return True
+
+    def _try_get(self, pid: int):
+        self._lock.acquire(pid)
+        try:
+            if not self._q:
+                return False, None
+            self._rw.acquire_write()
+            item = self._q.popleft()
+            self._rw.release_write()
+            size = len(self._q)
+            mark = self._watermark(size)
+        finally:
+            self._lock.release(pid)
+        with self._signal:
+            self._get_seq += 1
+            self._not_full.notify()
+        self._notify_mark(mark, size)
+        return True, item
+
+    def _try_put_many(self, items: List[object], pid: int) -> int:
+        mark = None
+        self._lock.acquire(pid)
+        try:
+            n = min(len(items), self._max_size - len(self._q))
+            if n > 0:
+                self._rw.acquire_write()
+                self._q.extend(items[:n])
+                self._appended += n
+                self._rw.release_write()
+                size = len(self._q)
+                mark = self._watermark(size)
+        finally:
+            self._lock.release(pid)
+        if n > 0:
+            with self._signal:
+                self._put_seq += 1
+                self._not_empty.notify(n)
+            self._notify_mark(mark, size)
+        return max(n, 0)
+
+    def _try_get_many(self, max_n: int, pid: int) -> List[object]:
+        self._lock.acquire(pid)
+        try:
+            q = self._q
+            self._rw.acquire_write()
+            out = [q.popleft() for _ in range(min(max_n, len(q)))]
+            self._rw.release_write()
+            size = len(q)
+            mark = self._watermark(size) if out else None
+        finally:
+            self._lock.release(pid)
+        if out:
+            with self._signal:
+                self._get_seq += 1
+                self._not_full.notify(len(out))
+            self._notify_mark(mark, size)
+        return out
+
+    def _put_overflowing(self, items: List[object], pid: int) -> int:
+        """One critical section under REJECT/DROP_*; returns how many items were stored."""
+        q = self._q
+        evicted = 0
+        self._lock.acquire(pid)
+        try:
+            if self._overflow == DROP_OLDEST:
+                # only the newest max_size items can survive the batch
+                stored = items[-self._max_size:] if len(items) > self._max_size else items
+                evicted = max(0, len(q) + len(stored) - self._max_size)
+            else:
+                stored = items[:max(0, self._max_size - len(q))]
+            if stored:
+                self._rw.acquire_write()
+                for _ in range(evicted):
+                    q.popleft()
+                q.extend(stored)
+                self._appended += len(stored)
+                self._rw.release_write()
+            size = len(q)
+            mark = self._watermark(size) if stored else None
         finally:
-            self._dekker.release(process_id)
+            self._lock.release(pid)
+        if stored:
+            with self._signal:
+                self._put_seq += 1
+                self._not_empty.notify(len(stored))
+            self._notify_mark(mark, size)
+        if evicted:
+            tracer = trace.ACTIVE
+            if tracer is not None:
+                tracer.record(trace.OP_EVICT, 0, 0, evicted)
+        lost = len(items) - len(stored)
+        if lost or evicted:
+            if self._overflow == REJECT:
+                self._count_lost(rejected=lost)
+            else:
+                self._count_lost(dropped=lost + evicted)
+        return len(stored)
+
+    def put(self, item, process_id: Optional[int] = None, block: bool = True,
+            timeout: Optional[float] = None) -> bool:
+        """
+        Append item. With block=True waits for free space (up to timeout
+        seconds, forever if None). Returns False if the item was not stored.
+        Under a non-blocking overflow policy, never waits.
+        """
+        tracer = trace.ACTIVE
+        if tracer is None:
+            return self._do_put(item, process_id, block, timeout)
+        t0 = trace.clock()
+        ok = self._do_put(item, process_id, block, timeout)
+        tracer.record(trace.OP_PUT if ok else trace.OP_PUT_FAILED, trace.traced_item(item), trace.clock() - t0)
+        return ok
+
+    def get(self, process_id: Optional[int] = None, block: bool = False,
+            timeout: Optional[float] = None) -> Optional[object]:
+        """
+        Pop the oldest item. Non-blocking by default (None when empty); with
+        block=True waits for an item up to timeout seconds (forever if None).
+        """
+        tracer = trace.ACTIVE
+        if tracer is None:
+            return self._do_get(process_id, block, timeout)
+        t0 = trace.clock()
+        item = self._do_get(process_id, block, timeout)
+        op = trace.OP_GET_EMPTY if item is None else trace.OP_GET
+        tracer.record(op, trace.traced_item(item), trace.clock() - t0)
+        return item
+
+    def put_many(self, items: Iterable[object], process_id: Optional[int] = None,
+                 block: bool = True, timeout: Optional[float] = None) -> int:
+        """
+        Append items in order, as many per critical section as fit. With
+        block=True waits for space for the rest (up to timeout seconds).
+        Returns how many items were stored.
+        """
+        tracer = trace.ACTIVE
+        if tracer is None:
+            return self._do_put_many(items, process_id, block, timeout)
+        items = list(items)
+        t0 = trace.clock()
+        stored = self._do_put_many(items, process_id, block, timeout)
+        first = trace.traced_item(items[0]) if items else 0
+        if 0 < stored < len(items) and self._overflow == DROP_OLDEST:
+            first = trace.traced_item(items[-stored])  # only the tail of the batch was kept
+        if stored:
+            tracer.record(trace.OP_PUT, first, trace.clock() - t0, stored)
+        else:
+            tracer.record(trace.OP_PUT_FAILED, first, trace.clock() - t0, len(items))
+        return stored
+
+    def get_many(self, max_n: int, process_id: Optional[int] = None, block: bool = False,
+                 timeout: Optional[float] = None) -> List[object]:
+        """
+        Pop up to max_n oldest items in one critical section. With block=True
+        waits until at least one item is available (up to timeout seconds).
+        """
+        tracer = trace.ACTIVE
+        if tracer is None:
+            return self._do_get_many(max_n, process_id, block, timeout)
+        t0 = trace.clock()
+        out = self._do_get_many(max_n, process_id, block, timeout)
+        if out:
+            tracer.record(trace.OP_GET, trace.traced_item(out[0]), trace.clock() - t0, len(out))
+        else:
+            tracer.record(trace.OP_GET_EMPTY, 0, trace.clock() - t0)
+        return out
+
+    def _do_put(self, item, process_id: Optional[int], block: bool, timeout: Optional[float]) -> bool:
+        pid = self._pid(process_id)
+        if self._overflow != BLOCK:
+            return self._put_overflowing([item], pid) == 1
+        capped = timeout is None and self._overflow_timeout is not None
+        if capped:
+            timeout = self._overflow_timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            # read the sequence before checking, so a get in between is not missed
+            with self._signal:
+                seen = self._get_seq
+            if self._try_put(item, pid):
+                return True
+            if not block:
+                return False
+            with self._signal:
+                while self._get_seq == seen:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        if capped:
+                            self.rejected += 1
+                        return False
+                    self._not_full.wait(remaining)
+
+    def _do_get(self, process_id: Optional[int], block: bool, timeout: Optional[float]) -> Optional[object]:
+        pid = self._pid(process_id)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._signal:
+                seen = self._put_seq
+            ok, item = self._try_get(pid)
+            if ok:
+                return item
+            if not block:
+                return None
+            with self._signal:
+                while self._put_seq == seen:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return None
+                    self._not_empty.wait(remaining)
+
+    def _do_put_many(self, items: Iterable[object], process_id: Optional[int], block: bool,
+                     timeout: Optional[float]) -> int:
+        pid = self._pid(process_id)
+        pending = list(items)
+        if self._overflow != BLOCK:
+            return self._put_overflowing(pending, pid)
+        capped = timeout is None and self._overflow_timeout is not None
+        if capped:
+            timeout = self._overflow_timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = 0
+        while done < len(pending):
+            with self._signal:
+                seen = self._get_seq
+            n = self._try_put_many(pending[done:], pid)
+            done += n
+            if n or done == len(pending):
+                continue
+            if not block:
+                break
+            with self._signal:
+                while self._get_seq == seen:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        if capped:
+                            self.rejected += len(pending) - done
+                        return done
+                    self._not_full.wait(remaining)
+        return done
+
+    def _do_get_many(self, max_n: int, process_id: Optional[int], block: bool,
+                     timeout: Optional[float]) -> List[object]:
+        pid = self._pid(process_id)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._signal:
+                seen = self._put_seq
+            out = self._try_get_many(max_n, pid)
+            if out or not block:
+                return out
+            with self._signal:
+                while self._put_seq == seen:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return []
+                    self._not_empty.wait(remaining)
 
     def size(self) -> int:
-        return len(self._q)
+        with self._rw.read_locked():
+            return len(self._q)
+
+    def snapshot(self) -> List[object]:
+        """Consistent copy of the buffer; workers wait at most for the copy."""
+        with self._rw.read_locked():
+            return list(self._q)
+
+    def tail(self, n: int) -> List[Tuple[int, object]]:
+        """
+        The newest n items as (seq, item), seq counting puts since creation.
+        Copies only those n items, under the read side of the observer lock.
+        """
+        with self._rw.read_locked():
+            appended = self._appended
+            items = list(itertools.islice(reversed(self._q), n))
+        items.reverse()
+        return list(zip(range(appended - len(items), appended), items))
 
-    def snapshot(self) -> Iterable[object]:
-        # no lock: used only for UI best-effort snapshot
-        return list(self._q)
+    def memory_usage(self) -> int:
+        """Approximate bytes held: the deque plus the boxed items in it."""
+        items = self.snapshot()
+        return sys.getsizeof(self._q) + sum(sys.getsizeof(it) for it in items)
 
     @property
     def max_size(self) -> int:
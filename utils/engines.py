@@ -0,0 +1,28 @@
+"""
+Registries of the mutual exclusion algorithms and the buffer engines built on
+them, by the names the benchmarks and the headless runner accept.
+"""
+from typing import Callable, Dict
+from synchronization.bakery_algorithm import BakeryLock
+from synchronization.dekker_algorithm import DekkerLock
+from synchronization.filter_algorithm import FilterLock
+from synchronization.mutex_manager import SharedMutex
+from synchronization.tournament_lock import TournamentLock
+from utils.buffer import ThreadSafeBuffer
+from utils.ring_buffer import SpscRingBuffer
+
+# name -> factory(parties)
+LOCKS: Dict[str, Callable[[int], object]] = {
+    "dekker": lambda n: DekkerLock(),
+    "mutex": lambda n: SharedMutex(),
+    "bakery": BakeryLock,
+    "filter": FilterLock,
+    "tournament": TournamentLock,
+}
+
+# name -> factory(max_size, parties)
+ENGINES: Dict[str, Callable[[int, int], object]] = {
+    **{name: (lambda size, n, make=make: ThreadSafeBuffer(max_size=size, lock=make(n)))
+       for name, make in LOCKS.items()},
+    "ring": lambda size, n: SpscRingBuffer(max_size=size),
+}
@@ -1,4 +1,8 @@
 import os
+import threading
+import time
+from typing import List, Optional
+from utils.segments import SegmentManifest
 
 
 def ensure_file(path: str):
@@ -36,3 +40,156 @@ def read_all_text(path: str) -> str:
             return f.read()
     except Exception as e:
         return f"<error reading file: {e}>"
+
+
+class FileAppender:
+    """
+    Long-lived appender: keeps the file open and buffers writes in memory.
+
+    Pending data is written in one go (group commit) when it reaches
+    `flush_bytes`, when `flush_interval` seconds pass after the first pending
+    write, or on flush()/close(). With `fsync=True` every flush is also forced
+    to disk. Safe to share between threads.
+
+    Rotation (off by default, see set_rotation()): once the file reaches
+    `max_bytes` or is `max_age` seconds old it is sealed into a numbered
+    segment recorded in a SegmentManifest and a fresh file is started. Sealing
+    is a rename, so the cost does not depend on the file size; optional gzip
+    of sealed segments runs in a background thread.
+    """
+
+    def __init__(self, path: str, flush_bytes: int = 4096, flush_interval: float = 0.2,
+                 fsync: bool = False):
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.max_bytes = 0
+        self.max_age = 0.0
+        self.compress = False
+        self._lock = threading.Lock()
+        self._pending: List[bytes] = []
+        self._pending_size = 0
+        self._timer: Optional[threading.Timer] = None
+        self._path = path
+        self._f = None
+        self.manifest = SegmentManifest(path)
+        # lines of the active segment, for the manifest; counted here, off the writers' lock
+        self._segment_lines = self._count_lines(path)
+        self._open()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _open(self):
+        if self._f is None:
+            ensure_file(self._path)
+            self._f = open(self._path, "ab", buffering=0)
+            self._segment_bytes = self._f.seek(0, os.SEEK_END)
+            self._segment_started = time.monotonic()
+        return self._f
+
+    def set_rotation(self, max_bytes: int = 0, max_age: float = 0.0, compress: bool = False):
+        """Seal the active file at `max_bytes` / after `max_age` s; 0 disables each."""
+        with self._lock:
+            self.max_bytes = max(0, int(max_bytes))
+            self.max_age = max(0.0, float(max_age))
+            self.compress = compress
+
+    def _rotation_due(self) -> bool:
+        if self.max_bytes and self._segment_bytes >= self.max_bytes:
+            return True
+        return bool(self.max_age and self._segment_bytes
+                    and time.monotonic() - self._segment_started >= self.max_age)
+
+    @staticmethod
+    def _count_lines(path: str) -> int:
+        try:
+            with open(path, "rb") as f:
+                return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+        except OSError:
+            return 0
+
+    def _rotate_locked(self):
+        lines = self._segment_lines
+        nbytes = self._segment_bytes
+        self._close_locked()
+        entry = self.manifest.seal(lines, nbytes)
+        self._open()
+        self._segment_lines = 0
+        if self.compress:
+            self.manifest.compress_async(entry["seq"])
+
+    def append_text(self, text: str):
+        data = text.encode("utf-8")
+        with self._lock:
+            self._pending.append(data)
+            self._pending_size += len(data)
+            if self._pending_size >= self.flush_bytes or self.flush_interval <= 0:
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def append_line(self, text: str):
+        self.append_text(text if text.endswith("\n") else text + "\n")
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _flush_locked(self):
+        self._cancel_timer()
+        if not self._pending:
+            return
+        data = b"".join(self._pending)
+        self._pending.clear()
+        self._pending_size = 0
+        f = self._open()
+        f.write(data)
+        if self.fsync:
+            os.fsync(f.fileno())
+        self._segment_bytes += len(data)
+        self._segment_lines += data.count(b"\n")
+        if (self.max_bytes or self.max_age) and self._rotation_due():
+            self._rotate_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def clear(self):
+        """Drop pending data, truncate the file and delete sealed segments."""
+        with self._lock:
+            self._cancel_timer()
+            self._pending.clear()
+            self._pending_size = 0
+            self._open().truncate(0)
+            self._segment_bytes = 0
+            self._segment_lines = 0
+            self._segment_started = time.monotonic()
+            self.manifest.clear()
+
+    def reopen(self, path: str):
+        """Flush to the current file and switch to `path`."""
+        lines = self._count_lines(path)
+        with self._lock:
+            self._flush_locked()
+            self._close_locked()
+            self._path = path
+            self.manifest = SegmentManifest(path)
+            self._segment_lines = lines
+            self._open()
+
+    def _close_locked(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._close_locked()
+
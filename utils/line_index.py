@@ -0,0 +1,155 @@
+import mmap
+import os
+from array import array
+from bisect import bisect_left
+from typing import List, Optional
+
+
+class LineIndex:
+    """
+    Sparse line-offset index over a growing text file.
+
+    Remembers how many newlines precede every BLOCK-byte boundary (8 bytes
+    per BLOCK bytes of file), so building it is one bytes.count() per block
+    rather than Python work per line. A line is located by bisecting to the
+    block holding its start and skipping at most one block's worth of
+    newlines. update() extends the index from the last scanned byte and
+    starts over when the file was truncated or replaced. Reads and searches
+    map the file only for the duration of the call, so the file can still be
+    truncated or replaced while indexed.
+    """
+
+    BLOCK = 1 << 14
+    CHUNK = 1 << 22  # bytes read per I/O call while scanning, a multiple of BLOCK
+
+    def __init__(self, path: str):
+        self.reset(path)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def reset(self, path: Optional[str] = None):
+        if path is not None:
+            self._path = path
+        self._counts = array("q", [0])  # newlines before byte 0, BLOCK, 2*BLOCK, ...
+        self._newlines = 0
+        self._last_start = 0  # offset just after the last newline
+        self._size = 0  # bytes scanned
+        self._stat_key = None
+
+    @property
+    def line_count(self) -> int:
+        # a trailing line without newline still counts
+        return self._newlines + (1 if self._size > self._last_start else 0)
+
+    def update(self) -> bool:
+        """Index bytes appended since the last call. True if anything changed."""
+        try:
+            st = os.stat(self._path)
+        except OSError:
+            if self._stat_key is None and self._size == 0:
+                return False
+            self.reset()
+            return True
+        key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        if key == self._stat_key:
+            return False
+        reset = self._stat_key is not None and (key[:2] != self._stat_key[:2] or st.st_size < self._size)
+        if reset:
+            self.reset()
+        self._stat_key = key
+        if st.st_size > self._size:
+            self._scan(st.st_size)
+        return True
+
+    def _scan(self, size: int):
+        block, counts = self.BLOCK, self._counts
+        pos, newlines = self._size, self._newlines
+        with open(self._path, "rb") as f:
+            f.seek(pos)
+            while pos < size:
+                # pieces end on block boundaries, so each boundary is a slice end
+                data = f.read(min(size, (pos // block) * block + self.CHUNK) - pos)
+                if not data:
+                    break
+                n = data.count(b"\n")
+                if n:
+                    self._last_start = pos + data.rindex(b"\n") + 1
+                boundary = (pos // block + 1) * block
+                i = 0
+                while boundary <= pos + len(data):
+                    newlines += data.count(b"\n", i, boundary - pos)
+                    counts.append(newlines)
+                    i = boundary - pos
+                    boundary += block
+                newlines += data.count(b"\n", i)
+                pos += len(data)
+        self._newlines = newlines
+        self._size = pos
+
+    def _map(self, f) -> Optional[mmap.mmap]:
+        """Map the indexed bytes; None, with the index started over, if the file shrank since update()."""
+        if os.fstat(f.fileno()).st_size < self._size:
+            self.reset()
+            return None
+        return mmap.mmap(f.fileno(), self._size, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def _skip_lines(mm, offset: int, n: int, end: int) -> int:
+        for _ in range(n):
+            i = mm.find(b"\n", offset, end)
+            if i < 0:
+                return end
+            offset = i + 1
+        return offset
+
+    def _offset_of(self, mm, line: int) -> int:
+        if line <= 0:
+            return 0
+        # last boundary with fewer than `line` newlines before it: the line starts in that block
+        k = bisect_left(self._counts, line) - 1
+        return self._skip_lines(mm, k * self.BLOCK, line - self._counts[k], self._size)
+
+    def _line_at(self, mm, offset: int) -> int:
+        k = min(offset // self.BLOCK, len(self._counts) - 1)
+        return self._counts[k] + mm[k * self.BLOCK:offset].count(b"\n")
+
+    def read_lines(self, start: int, count: int) -> List[str]:
+        """Lines [start, start+count) without their newlines."""
+        start = max(0, min(start, self.line_count))
+        count = min(count, self.line_count - start)
+        if count <= 0 or self._size == 0:
+            return []
+        with open(self._path, "rb") as f:
+            mm = self._map(f)
+            if mm is None:
+                return []
+            with mm:
+                begin = self._offset_of(mm, start)
+                end = self._skip_lines(mm, begin, count, self._size)
+                data = mm[begin:end]
+        text = data.decode("utf-8", errors="replace")
+        return text.split("\n")[:count]
+
+    def search(self, needle: str, from_line: int = 0, backwards: bool = False) -> Optional[int]:
+        """
+        Line number of the next line at or after `from_line` (or the previous
+        one before it) containing `needle`, or None.
+        """
+        if not needle or self._size == 0:
+            return None
+        pattern = needle.encode("utf-8")
+        from_line = max(0, from_line)
+        if from_line >= self.line_count and not backwards:
+            return None
+        with open(self._path, "rb") as f:
+            mm = self._map(f)
+            if mm is None:
+                return None
+            with mm:
+                offset = self._size if from_line >= self.line_count else self._offset_of(mm, from_line)
+                hit = mm.rfind(pattern, 0, offset) if backwards else mm.find(pattern, offset)
+                if hit < 0:
+                    return None
+                return self._line_at(mm, hit)
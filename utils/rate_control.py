@@ -0,0 +1,170 @@
+"""
+Feedback control of the producer/consumer delays toward a target buffer
+occupancy, or a target end-to-end latency (estimated with Little's law:
+items waiting / items consumed per second).
+
+The controller is stepped by a single caller at a fixed interval (the GUI's
+frame scheduler, the headless runner) and acts only through set_delay(), so
+it drives every engine with the worker surface: threads, pools, processes
+and asyncio actor groups.
+"""
+import math
+import time
+from typing import Optional
+
+PID = "pid"
+AIMD = "aimd"
+CONTROL_MODES = (PID, AIMD)
+
+OCCUPANCY = "occupancy"
+LATENCY = "latency"
+CONTROL_METRICS = (OCCUPANCY, LATENCY)
+
+# which side a decision moved: +1 faster (shorter delay), -1 slower, 0 held
+PRODUCER = "producer"
+CONSUMER = "consumer"
+
+
+class RateController:
+    """
+    Keeps the buffer at `target` (fraction of max_size for OCCUPANCY,
+    seconds for LATENCY).
+
+    Too empty: the producer speeds up first; once it is at min_delay the
+    consumers back off, instead of waking up to an empty buffer. Too full:
+    the consumers speed up first, then the producer slows down. The pipeline
+    settles at the fastest rate the slower side sustains.
+
+    PID works on one position `s` in log-delay space: 0 is the slowest
+    producer with the fastest consumers, `span` the fastest producer, and
+    past it the consumer delay grows, up to 2 * span. Velocity form, so
+    clamping `s` is all the anti-windup it needs.
+
+    AIMD raises the producer rate by a fixed step while the buffer is too
+    empty (lowers the consumer rate once the producer is at min_delay) and
+    halves the delay of the side at fault when it is too full.
+    """
+
+    def __init__(self, buffer, producer, consumer, target: float = 0.5, metric: str = OCCUPANCY,
+                 mode: str = PID, min_delay: float = 0.001, max_delay: float = 2.0,
+                 kp: float = 1.0, ki: float = 2.0, kd: float = 0.0,
+                 aimd_step: float = 10.0, deadband: float = 0.05, smoothing: float = 0.3):
+        if metric not in CONTROL_METRICS:
+            raise ValueError(f"unknown metric {metric!r}, expected one of {CONTROL_METRICS}")
+        if mode not in CONTROL_MODES:
+            raise ValueError(f"unknown mode {mode!r}, expected one of {CONTROL_MODES}")
+        self.buffer = buffer
+        self.producer = producer
+        self.consumer = consumer
+        self.target = target
+        self.metric = metric
+        self.mode = mode
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.kp, self.ki, self.kd = kp, ki, kd
+        self.aimd_step = aimd_step  # ticks/s added to the producer's (or taken off the consumers') rate per step
+        self.deadband = deadband
+        self.smoothing = smoothing
+        self._span = math.log(max_delay / min_delay)
+        self.last: Optional[dict] = None
+        self.reset(producer_delay=max_delay)
+
+    def reset(self, producer_delay: float):
+        """Start from `producer_delay` with the consumers at full speed."""
+        producer_delay = min(max(producer_delay, self.min_delay), self.max_delay)
+        self._s = math.log(self.max_delay / producer_delay)
+        self.producer_delay = producer_delay
+        self.consumer_delay = self.min_delay
+        self._e1 = self._e2 = 0.0
+        self._mark = None  # (time, consumed total) of the previous step
+        self._size = None
+        self._rate = 0.0
+        self.producer.set_delay(self.producer_delay)
+        self.consumer.set_delay(self.consumer_delay)
+
+    def _error(self) -> tuple[float, float]:
+        """(error in -1..1, positive: buffer too empty; measured value)."""
+        if self.metric == OCCUPANCY:
+            occupancy = self._size / self.buffer.max_size
+            return max(-1.0, min(1.0, self.target - occupancy)), occupancy
+        if self._rate > 0:
+            latency = self._size / self._rate
+        else:
+            latency = math.inf if self._size >= 1 else 0.0
+        if math.isinf(latency):
+            return -1.0, latency
+        return max(-1.0, min(1.0, (self.target - latency) / self.target)), latency
+
+    def _pid(self, error: float, dt: float):
+        ds = self.kp * (error - self._e1) + self.ki * error * dt
+        if self.kd:
+            ds += self.kd * (error - 2 * self._e1 + self._e2) / dt
+        self._e2, self._e1 = self._e1, error
+        self._s = min(max(self._s + ds, 0.0), 2 * self._span)
+        self.producer_delay = self.max_delay * math.exp(-min(self._s, self._span))
+        self.consumer_delay = self.min_delay * math.exp(max(0.0, self._s - self._span))
+
+    def _aimd(self, error: float):
+        p, c = self.producer_delay, self.consumer_delay
+        if error > self.deadband:
+            if p > self.min_delay:
+                p = 1.0 / (1.0 / p + self.aimd_step)
+            else:
+                c = 1.0 / max(1.0 / c - self.aimd_step, 1.0 / self.max_delay)
+        elif error < -self.deadband:
+            if c > self.min_delay:
+                c /= 2
+            else:
+                p *= 2
+        self.producer_delay = min(max(p, self.min_delay), self.max_delay)
+        self.consumer_delay = min(max(c, self.min_delay), self.max_delay)
+
+    @staticmethod
+    def _direction(old: float, new: float) -> int:
+        if math.isclose(old, new, rel_tol=1e-3):
+            return 0
+        return 1 if new < old else -1
+
+    def step(self) -> Optional[dict]:
+        """
+        Measure, decide and apply new delays. Returns the decision (also kept
+        in `last`), or None on the first call, which only takes the marks.
+        """
+        now = time.monotonic()
+        size = self.buffer.size()
+        consumed = self.consumer.count
+        if self._mark is None:
+            self._mark = (now, consumed)
+            self._size = size
+            return None
+        t0, c0 = self._mark
+        dt = now - t0
+        if dt <= 0:
+            return self.last
+        self._mark = (now, consumed)
+        a = self.smoothing
+        self._size += a * (size - self._size)
+        self._rate += a * ((consumed - c0) / dt - self._rate)
+
+        error, measured = self._error()
+        old_p, old_c = self.producer_delay, self.consumer_delay
+        if self.mode == PID:
+            self._pid(error, dt)
+        else:
+            self._aimd(error)
+        if self.producer_delay != old_p:
+            self.producer.set_delay(self.producer_delay)
+        if self.consumer_delay != old_c:
+            self.consumer.set_delay(self.consumer_delay)
+        self.last = {
+            "metric": self.metric,
+            "measured": measured,
+            "target": self.target,
+            "error": error,
+            "consumed_per_s": self._rate,
+            "producer_delay": self.producer_delay,
+            "consumer_delay": self.consumer_delay,
+            PRODUCER: self._direction(old_p, self.producer_delay),
+            CONSUMER: self._direction(old_c, self.consumer_delay),
+        }
+        return self.last
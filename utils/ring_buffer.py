@@ -0,0 +1,157 @@
+import sys
+import threading
+import time
+from array import array
+from typing import Iterable, List, Optional, Tuple
+from synchronization.fences import FENCES, memory_fence
+from utils.buffer import ProcessIdPool
+
+
+class SpscRingBuffer:
+    """
+    Lock-free bounded ring buffer for exactly one producer and one consumer.
+
+    Slots are a preallocated typed array (signed 64-bit ints by default), so
+    items are stored unboxed. The producer owns `_tail`, the consumer owns
+    `_head`; both only ever grow, `tail - head` is the fill level and
+    `counter % capacity` the slot. Each side writes its own counter only after
+    the slot it covers is written or read, so no lock is needed.
+
+    Surface matches ThreadSafeBuffer (put/get/put_many/get_many/size/snapshot/
+    max_size, register/unregister). Waiting on a full/empty ring yields with
+    sleep(0) first and then backs off with short sleeps; there is no lock to
+    park on.
+    """
+
+    def __init__(self, max_size: int = 100, typecode: str = "q"):
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self._slots = array(typecode, [0]) * max_size
+        self._max_size = max_size
+        self._head = 0
+        self._tail = 0
+        self._ids = ProcessIdPool(2)
+        # free-threaded build: order slot accesses against counter publication
+        self._fence = threading.Lock()
+
+    @property
+    def parties(self) -> int:
+        return 2
+
+    def register(self) -> int:
+        return self._ids.register()
+
+    def unregister(self):
+        self._ids.unregister()
+
+    @staticmethod
+    def _backoff(attempt: int):
+        time.sleep(0 if attempt < 50 else 0.0005)
+
+    def _wait(self, ready, block: bool, timeout: Optional[float]) -> bool:
+        if ready():
+            return True
+        if not block:
+            return False
+        deadline = None if timeout is None else time.monotonic() + timeout
+        attempt = 0
+        while not ready():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            self._backoff(attempt)
+            attempt += 1
+        return True
+
+    def _has_space(self) -> bool:
+        return self._tail - self._head < self._max_size
+
+    def _has_data(self) -> bool:
+        return self._tail != self._head
+
+    def put(self, item, process_id: Optional[int] = None, block: bool = True,
+            timeout: Optional[float] = None) -> bool:
+        if not self._wait(self._has_space, block, timeout):
+            return False
+        tail = self._tail
+        self._slots[tail % self._max_size] = item
+        if FENCES:
+            memory_fence(self._fence)
+        self._tail = tail + 1  # publish after the slot is written
+        return True
+
+    def get(self, process_id: Optional[int] = None, block: bool = False,
+            timeout: Optional[float] = None) -> Optional[object]:
+        if not self._wait(self._has_data, block, timeout):
+            return None
+        if FENCES:
+            memory_fence(self._fence)  # read the slot after seeing the tail move
+        head = self._head
+        item = self._slots[head % self._max_size]
+        if FENCES:
+            memory_fence(self._fence)
+        self._head = head + 1  # free the slot after it is read
+        return item
+
+    def put_many(self, items: Iterable[object], process_id: Optional[int] = None,
+                 block: bool = True, timeout: Optional[float] = None) -> int:
+        pending = list(items)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        cap = self._max_size
+        done = 0
+        while done < len(pending):
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not self._wait(self._has_space, block, remaining):
+                break
+            tail = self._tail
+            n = min(len(pending) - done, cap - (tail - self._head))
+            for i in range(n):
+                self._slots[(tail + i) % cap] = pending[done + i]
+            if FENCES:
+                memory_fence(self._fence)
+            self._tail = tail + n
+            done += n
+        return done
+
+    def get_many(self, max_n: int, process_id: Optional[int] = None, block: bool = False,
+                 timeout: Optional[float] = None) -> List[object]:
+        if not self._wait(self._has_data, block, timeout):
+            return []
+        head = self._head
+        n = min(max_n, self._tail - head)
+        if FENCES:
+            memory_fence(self._fence)
+        cap = self._max_size
+        out = [self._slots[(head + i) % cap] for i in range(n)]
+        if FENCES:
+            memory_fence(self._fence)
+        self._head = head + n
+        return out
+
+    def size(self) -> int:
+        return self._tail - self._head
+
+    def snapshot(self) -> Iterable[object]:
+        # no lock: best-effort view, slots may be overwritten while copying
+        head, tail = self._head, self._tail
+        return [self._slots[i % self._max_size] for i in range(head, tail)]
+
+    def tail(self, n: int) -> List[Tuple[int, object]]:
+        """
+        The newest n items as (seq, item); seq is the item's tail counter.
+        Slots the producer may have reused while copying are dropped.
+        """
+        cap = self._max_size
+        tail = self._tail
+        start = max(self._head, tail - n)
+        items = [self._slots[s % cap] for s in range(start, tail)]
+        # seq s is overwritten once the tail passes s + cap; consumed ones are gone
+        valid = max(self._head, self._tail - cap)
+        return [(s, it) for s, it in zip(range(start, tail), items) if s >= valid]
+
+    def memory_usage(self) -> int:
+        """Bytes held by the preallocated slot array."""
+        return sys.getsizeof(self._slots)
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
@@ -0,0 +1,151 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from typing import List
+
+
+class SegmentManifest:
+    """
+    Sealed segments of a rotated output file, kept in `<path>.manifest.json`.
+
+    The file at `path` is always the active segment; rotation renames it to
+    `<root>.<seq><ext>` and records the segment's global line and byte range:
+
+        {"segments": [{"name": "user.000001.txt", "seq": 1,
+                       "first_line": 0, "lines": 1200,
+                       "first_byte": 0, "bytes": 65536, "compressed": false}]}
+
+    Names are relative to the directory of `path`. Thread-safe.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.manifest_path = path + ".manifest.json"
+        self._lock = threading.Lock()
+        self._segments: List[dict] = self._load()
+
+    def _load(self) -> List[dict]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("segments", [])
+        except (OSError, ValueError):
+            return []
+
+    def _save_locked(self):
+        if not self._segments:
+            if os.path.exists(self.manifest_path):
+                os.remove(self.manifest_path)
+            return
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"segments": self._segments}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.manifest_path)
+
+    def segments(self) -> List[dict]:
+        with self._lock:
+            return [dict(s) for s in self._segments]
+
+    def _segment_name(self, seq: int) -> str:
+        root, ext = os.path.splitext(os.path.basename(self.path))
+        return f"{root}.{seq:06d}{ext}"
+
+    def full_path(self, name: str) -> str:
+        return os.path.join(os.path.dirname(self.path) or ".", name)
+
+    def seal(self, lines: int, nbytes: int) -> dict:
+        """
+        Rename the (closed) active file into the next segment and record it.
+        Only a rename and a small manifest write, whatever the segment size.
+        """
+        with self._lock:
+            seq = self._segments[-1]["seq"] + 1 if self._segments else 1
+            first_line, first_byte = 0, 0
+            if self._segments:
+                last = self._segments[-1]
+                first_line = last["first_line"] + last["lines"]
+                first_byte = last["first_byte"] + last["bytes"]
+            entry = {"name": self._segment_name(seq), "seq": seq, "first_line": first_line,
+                     "lines": lines, "first_byte": first_byte, "bytes": nbytes, "compressed": False}
+            os.replace(self.path, self.full_path(entry["name"]))
+            self._segments.append(entry)
+            self._save_locked()
+            return dict(entry)
+
+    def compress(self, seq: int):
+        """gzip a sealed segment (run off the writers' path)."""
+        with self._lock:
+            entry = next((s for s in self._segments if s["seq"] == seq and not s["compressed"]), None)
+            if entry is None:
+                return
+            src = self.full_path(entry["name"])
+        dst = src + ".gz"
+        with open(src, "rb") as fin, gzip.open(dst + ".tmp", "wb") as fout:
+            shutil.copyfileobj(fin, fout)
+        os.replace(dst + ".tmp", dst)
+        with self._lock:
+            if entry not in self._segments:  # cleared meanwhile
+                os.remove(dst)
+                return
+            entry["name"] += ".gz"
+            entry["compressed"] = True
+            self._save_locked()
+        try:
+            os.remove(src)
+        except OSError:
+            pass  # still open by a reader (Windows); it is no longer referenced
+
+    def compress_async(self, seq: int):
+        threading.Thread(target=self.compress, args=(seq,), daemon=True).start()
+
+    def clear(self):
+        """Delete every sealed segment and the manifest."""
+        with self._lock:
+            for entry in self._segments:
+                for name in (entry["name"], entry["name"].removesuffix(".gz")):
+                    try:
+                        os.remove(self.full_path(name))
+                    except OSError:
+                        pass
+                self._drop_cached(self.full_path(entry["name"]))
+            self._segments = []
+            self._save_locked()
+
+    @staticmethod
+    def _cache_prefix(path: str) -> str:
+        # unpacked copies are keyed by the full .gz path: segment names repeat
+        # across directories and restart at 1 after clear()
+        cache = os.path.join(tempfile.gettempdir(), "os-lw-segments")
+        return os.path.join(cache, hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16] + "-")
+
+    def _drop_cached(self, path: str):
+        prefix = self._cache_prefix(path)
+        cache, base = os.path.split(prefix)
+        try:
+            names = os.listdir(cache)
+        except OSError:
+            return
+        for name in names:
+            if name.startswith(base):
+                try:
+                    os.remove(os.path.join(cache, name))
+                except OSError:
+                    pass
+
+    def readable_path(self, entry: dict) -> str:
+        """Plain-text path for a segment; compressed ones are unpacked to a temp file."""
+        path = self.full_path(entry["name"])
+        if not entry["compressed"]:
+            return path
+        st = os.stat(path)
+        out = f"{self._cache_prefix(path)}{st.st_mtime_ns}-{st.st_size}-{entry['name'].removesuffix('.gz')}"
+        if not os.path.exists(out):
+            self._drop_cached(path)  # copies of an older .gz at this path
+            os.makedirs(os.path.dirname(out), exist_ok=True)
+            with gzip.open(path, "rb") as fin, open(out + ".tmp", "wb") as fout:
+                shutil.copyfileobj(fin, fout)
+            os.replace(out + ".tmp", out)
+        return out
@@ -0,0 +1,168 @@
+import sys
+import time
+from multiprocessing import shared_memory
+from typing import Iterable, List, Optional, Tuple
+from synchronization.dekker_algorithm import SharedDekkerLock
+
+# int64 header slots, followed by `capacity` int64 item slots
+_FLAG0, _FLAG1, _TURN, _HEAD, _TAIL, _CAPACITY = range(6)
+_HEADER = 6
+_ITEM = 8
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        # 3.13+: the creating process owns cleanup, attachers must not
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedRingBuffer:
+    """
+    Bounded ring buffer of int64 items in a multiprocessing.shared_memory
+    segment, shared by one producer process (process_id 0) and one consumer
+    process (process_id 1).
+
+    Dekker's flag/turn variables sit in the segment header next to the head and
+    tail counters, so mutual exclusion is the same algorithm as in
+    ThreadSafeBuffer, only across processes. Other processes attach with
+    SharedRingBuffer(name=buffer.name).
+    """
+
+    def __init__(self, max_size: int = 100, name: Optional[str] = None):
+        if name is None:
+            if max_size < 1:
+                raise ValueError("max_size must be >= 1")
+            self._shm = shared_memory.SharedMemory(create=True, size=(_HEADER + max_size) * _ITEM)
+            self._owner = True
+        else:
+            self._shm = _attach(name)
+            self._owner = False
+        self._words = self._shm.buf.cast("q")
+        if self._owner:
+            self._words[:_HEADER] = memoryview(bytes(_HEADER * _ITEM)).cast("q")
+            self._words[_CAPACITY] = max_size
+        self._max_size = self._words[_CAPACITY]
+        self._slots = self._words[_HEADER:_HEADER + self._max_size]
+        self._dekker = SharedDekkerLock(self._words[_FLAG0:_TURN + 1])
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def parties(self) -> int:
+        return 2
+
+    def _try_put_many(self, items: List[object], pid: int) -> int:
+        w = self._words
+        cap = self._max_size
+        self._dekker.acquire(pid)
+        try:
+            tail = w[_TAIL]
+            n = min(len(items), cap - (tail - w[_HEAD]))
+            for i in range(n):
+                self._slots[(tail + i) % cap] = items[i]
+            w[_TAIL] = tail + n
+        finally:
+            self._dekker.release(pid)
+        return max(n, 0)
+
+    def _try_get_many(self, max_n: int, pid: int) -> List[object]:
+        w = self._words
+        cap = self._max_size
+        self._dekker.acquire(pid)
+        try:
+            head = w[_HEAD]
+            n = min(max_n, w[_TAIL] - head)
+            out = [self._slots[(head + i) % cap] for i in range(n)]
+            w[_HEAD] = head + n
+        finally:
+            self._dekker.release(pid)
+        return out
+
+    @staticmethod
+    def _backoff(attempt: int):
+        # no cross-process condition to park on; yield, then sleep briefly
+        time.sleep(0 if attempt < 50 else 0.0005)
+
+    def put_many(self, items: Iterable[object], process_id: int = 0, block: bool = True,
+                 timeout: Optional[float] = None) -> int:
+        pending = list(items)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = 0
+        attempt = 0
+        while done < len(pending):
+            n = self._try_put_many(pending[done:], process_id)
+            done += n
+            if n:
+                attempt = 0
+                continue
+            if not block or (deadline is not None and time.monotonic() >= deadline):
+                break
+            self._backoff(attempt)
+            attempt += 1
+        return done
+
+    def get_many(self, max_n: int, process_id: int = 1, block: bool = False,
+                 timeout: Optional[float] = None) -> List[object]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        attempt = 0
+        while True:
+            out = self._try_get_many(max_n, process_id)
+            if out or not block:
+                return out
+            if deadline is not None and time.monotonic() >= deadline:
+                return out
+            self._backoff(attempt)
+            attempt += 1
+
+    def put(self, item, process_id: int = 0, block: bool = True,
+            timeout: Optional[float] = None) -> bool:
+        return self.put_many([item], process_id, block, timeout) == 1
+
+    def get(self, process_id: int = 1, block: bool = False,
+            timeout: Optional[float] = None) -> Optional[object]:
+        out = self.get_many(1, process_id, block, timeout)
+        return out[0] if out else None
+
+    def size(self) -> int:
+        return self._words[_TAIL] - self._words[_HEAD]
+
+    def snapshot(self) -> Iterable[object]:
+        # no lock: the GUI process is not a Dekker party, best-effort view
+        head, tail = self._words[_HEAD], self._words[_TAIL]
+        return [self._slots[i % self._max_size] for i in range(head, tail)]
+
+    def tail(self, n: int) -> List[Tuple[int, object]]:
+        """
+        The newest n items as (seq, item); seq is the item's tail counter.
+        Slots the producer may have reused while copying are dropped.
+        """
+        cap = self._max_size
+        tail = self._words[_TAIL]
+        start = max(self._words[_HEAD], tail - n)
+        items = [self._slots[s % cap] for s in range(start, tail)]
+        # seq s is overwritten once the tail passes s + cap; consumed ones are gone
+        valid = max(self._words[_HEAD], self._words[_TAIL] - cap)
+        return [(s, it) for s, it in zip(range(start, tail), items) if s >= valid]
+
+    def memory_usage(self) -> int:
+        return self._shm.size + sys.getsizeof(self._shm)
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    def close(self):
+        """Detach from the segment; the creating side also unlinks it."""
+        if self._words is None:
+            return
+        self._dekker.detach()
+        self._slots.release()
+        self._words.release()
+        self._words = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
@@ -0,0 +1,40 @@
+import time
+from typing import Optional
+
+
+class ThroughputSampler:
+    """
+    Derives rates from running totals. Meant to be sampled by a single reader
+    (the GUI, once per frame): workers only bump their own plain counters and
+    never call into it, so the hot path has no shared writes and no Tk calls.
+    """
+
+    def __init__(self, window: float = 1.0):
+        self.window = window
+        self._mark: Optional[tuple] = None
+        self._occupancy_sum = 0.0
+        self._occupancy_n = 0
+        self._last = {"produced_per_s": 0.0, "consumed_per_s": 0.0, "occupancy_avg": 0.0}
+
+    def sample(self, produced: int, consumed: int, occupancy: float) -> dict:
+        """
+        Feed the current totals and buffer fill (0..1). Rates and the
+        occupancy average are recomputed once per `window` seconds.
+        """
+        now = time.monotonic()
+        self._occupancy_sum += occupancy
+        self._occupancy_n += 1
+        if self._mark is None:
+            self._mark = (now, produced, consumed)
+        t0, p0, c0 = self._mark
+        dt = now - t0
+        if dt >= self.window:
+            self._last = {
+                "produced_per_s": (produced - p0) / dt,
+                "consumed_per_s": (consumed - c0) / dt,
+                "occupancy_avg": self._occupancy_sum / self._occupancy_n,
+            }
+            self._mark = (now, produced, consumed)
+            self._occupancy_sum = 0.0
+            self._occupancy_n = 0
+        return {"produced": produced, "consumed": consumed, "occupancy": occupancy, **self._last}
@@ -0,0 +1,376 @@
+"""
+Binary event trace of buffer, lock and writer activity.
+
+    start_tracing("run.trace")   # hooks start recording
+    ...
+    stop_tracing()               # final flush, file closed
+
+    python -m utils.trace summary run.trace
+    python -m utils.trace chrome run.trace -o run.json   # chrome://tracing, Perfetto
+
+Every thread records into its own preallocated ring of int64 slots (one
+writer per ring, so recording takes no lock); a background thread copies new
+events to the file every `flush_interval` seconds. If a thread outruns the
+flusher by a whole ring, its oldest events are lost and counted.
+
+File: MAGIC, then chunks of kind (1 byte) + payload length (uint32 LE):
+  b"E": uint32 thread id, then events of four int64 each:
+        timestamp ns, op << 32 | n, item, wait ns
+  b"N": JSON {thread id: thread name}
+  b"L": uint64 number of lost events
+"""
+import argparse
+import itertools
+import json
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+MAGIC = b"OSLWTRC\x01"
+_FIELDS = 4
+
+# operations; `item` is the item (first item of a batch), the process id or byte count
+OP_PUT = 1
+OP_GET = 2
+OP_PUT_FAILED = 3
+OP_GET_EMPTY = 4
+OP_LOCK_ACQUIRE = 5
+OP_LOCK_RELEASE = 6
+OP_MUTEX_ACQUIRE = 7
+OP_MUTEX_RELEASE = 8
+OP_WRITE = 9
+OP_EVICT = 10  # DROP_OLDEST pushed `n` items out of the buffer
+
+OP_NAMES = {
+    OP_PUT: "put",
+    OP_GET: "get",
+    OP_PUT_FAILED: "put failed",
+    OP_GET_EMPTY: "get empty",
+    OP_LOCK_ACQUIRE: "dekker acquire",
+    OP_LOCK_RELEASE: "dekker release",
+    OP_MUTEX_ACQUIRE: "mutex acquire",
+    OP_MUTEX_RELEASE: "mutex release",
+    OP_WRITE: "file write",
+    OP_EVICT: "evict",
+}
+
+# the running tracer; hooks check this and record nothing while it is None
+ACTIVE: Optional["Tracer"] = None
+
+clock = time.perf_counter_ns
+
+
+class _Ring:
+    __slots__ = ("tid", "name", "slots", "head", "flushed")
+
+    def __init__(self, tid: int, name: str, capacity: int):
+        self.tid = tid
+        self.name = name
+        self.slots = array("q", [0]) * (capacity * _FIELDS)
+        self.head = 0  # events written; bumped after the event's slots
+        self.flushed = 0
+
+
+class Tracer:
+    def __init__(self, path: str, capacity: int = 1 << 15, flush_interval: float = 0.2):
+        self.path = path
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.lost = 0
+        self._rings: List[_Ring] = []
+        self._rings_lock = threading.Lock()
+        self._local = threading.local()
+        self._tids = itertools.count(1)
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="trace-flush", daemon=True)
+        self._flusher.start()
+
+    def _ring(self) -> _Ring:
+        with self._rings_lock:
+            ring = _Ring(next(self._tids), threading.current_thread().name, self.capacity)
+            self._rings.append(ring)
+        self._local.ring = ring
+        return ring
+
+    def record(self, op: int, item: int = 0, wait_ns: int = 0, n: int = 1):
+        try:
+            ring = self._local.ring
+        except AttributeError:
+            ring = self._ring()
+        i = (ring.head % self.capacity) * _FIELDS
+        slots = ring.slots
+        slots[i] = clock()
+        slots[i + 1] = (op << 32) | n
+        slots[i + 2] = item
+        slots[i + 3] = wait_ns
+        ring.head += 1
+
+    def _chunk(self, kind: bytes, payload: bytes):
+        self._file.write(kind + struct.pack("<I", len(payload)) + payload)
+
+    def flush(self):
+        """Copy every ring's new events to the file (flusher thread and stop() only)."""
+        with self._rings_lock:
+            rings = list(self._rings)
+        cap = self.capacity
+        lost = 0
+        for ring in rings:
+            end = ring.head
+            start = max(ring.flushed, end - cap)
+            if start == end:
+                continue
+            a, b = start % cap, end % cap
+            if a < b:
+                data = ring.slots[a * _FIELDS:b * _FIELDS]
+            else:
+                data = ring.slots[a * _FIELDS:] + ring.slots[:b * _FIELDS]
+            # slots the writer lapped while we copied are garbage: drop them
+            overrun = ring.head - cap - start
+            if overrun > 0:
+                data = data[overrun * _FIELDS:]
+            lost += max(0, start - ring.flushed) + max(0, overrun)
+            ring.flushed = end
+            if data:
+                self._chunk(b"E", struct.pack("<I", ring.tid) + data.tobytes())
+        if lost:
+            self.lost += lost
+        self._file.flush()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        self._stop.set()
+        self._flusher.join()
+        self.flush()
+        with self._rings_lock:
+            names = {ring.tid: ring.name for ring in self._rings}
+        self._chunk(b"N", json.dumps(names).encode("utf-8"))
+        self._chunk(b"L", struct.pack("<Q", self.lost))
+        self._file.close()
+
+
+def start_tracing(path: str, **kwargs) -> Tracer:
+    """Start recording into `path`; replaces (and closes) a running tracer."""
+    global ACTIVE
+    stop_tracing()
+    ACTIVE = Tracer(path, **kwargs)
+    return ACTIVE
+
+
+def stop_tracing():
+    global ACTIVE
+    tracer, ACTIVE = ACTIVE, None
+    if tracer is not None:
+        tracer.close()
+
+
+def traced_item(item) -> int:
+    """The int64 stored for an item: ints as is, anything else as -1."""
+    return item if type(item) is int and -(1 << 63) <= item < (1 << 63) else -1
+
+
+# (timestamp ns, thread id, op, n, item, wait ns)
+Event = Tuple[int, int, int, int, int, int]
+
+
+def read_trace(path: str) -> Tuple[List[Event], Dict[int, str], int]:
+    """All events of a trace file sorted by time, thread names and the lost count."""
+    events: List[Event] = []
+    names: Dict[int, str] = {}
+    lost = 0
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: not a trace file")
+        while True:
+            header = f.read(5)
+            if len(header) < 5:
+                break  # end, or a chunk cut short by a crash
+            kind, size = header[:1], struct.unpack("<I", header[1:])[0]
+            payload = f.read(size)
+            if len(payload) < size:
+                break
+            if kind == b"E":
+                tid = struct.unpack("<I", payload[:4])[0]
+                data = array("q")
+                data.frombytes(payload[4:])
+                for i in range(0, len(data), _FIELDS):
+                    meta = data[i + 1]
+                    events.append((data[i], tid, meta >> 32, meta & 0xFFFFFFFF, data[i + 2], data[i + 3]))
+            elif kind == b"N":
+                names.update({int(k): v for k, v in json.loads(payload).items()})
+            elif kind == b"L":
+                lost = struct.unpack("<Q", payload)[0]
+    events.sort()
+    return events, names, lost
+
+
+def to_chrome(path: str) -> dict:
+    """
+    Chrome trace JSON: one complete ("X") event per operation that spans its
+    wait, so blocking puts/gets and contended acquires show up as long bars.
+    """
+    events, names, lost = read_trace(path)
+    t0 = events[0][0] if events else 0
+    out = [{"ph": "M", "name": "thread_name", "pid": 1, "tid": tid, "args": {"name": name}}
+           for tid, name in names.items()]
+    for ts, tid, op, n, item, wait in events:
+        out.append({
+            "ph": "X", "name": OP_NAMES.get(op, str(op)), "pid": 1, "tid": tid,
+            "ts": (ts - wait - t0) / 1000.0, "dur": wait / 1000.0,
+            "args": {"item": item, "n": n},
+        })
+    return {"traceEvents": out, "displayTimeUnit": "ns", "otherData": {"lost_events": lost}}
+
+
+class _ReplayWorker:
+    """Producer/consumer stand-in for the GUI: count and status of a replay."""
+
+    def __init__(self, replay: "TraceReplay"):
+        self._replay = replay
+        self.count = 0
+
+    @property
+    def status(self) -> str:
+        return self._replay.status
+
+    def start_safe(self):
+        self._replay.play()
+
+    def resume(self):
+        self._replay.play()
+
+    def pause(self):
+        self._replay.pause()
+
+    def stop(self):
+        self._replay.pause()
+
+    def set_delay(self, delay: float):
+        pass
+
+    def set_batch_size(self, n: int):
+        pass
+
+
+class TraceReplay:
+    """
+    Plays a trace's put/get/evict events back against a deque in real time (times
+    `speed`), with the observer surface of the buffers (size, tail, snapshot,
+    memory_usage, max_size) so the prod-cons views can show a recorded run.
+    Batches replay as `n` consecutive ints starting at the recorded item,
+    which is what ProducerThread produces. Time advances when observed.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0):
+        events, self.names, self.lost = read_trace(path)
+        self._events = [e for e in events if e[2] in (OP_PUT, OP_GET, OP_EVICT)]
+        self.speed = speed
+        self._q: deque = deque()
+        self._i = 0
+        self._appended = 0
+        self._max_seen = 0
+        self._t0 = self._events[0][0] if self._events else 0
+        self._pos = self._t0  # trace time reached
+        self._playing_since: Optional[float] = None
+        self.producer = _ReplayWorker(self)
+        self.consumer = _ReplayWorker(self)
+
+    @property
+    def status(self) -> str:
+        if self._i >= len(self._events):
+            return "STOP"
+        return "RUNNING" if self._playing_since is not None else "PAUSED"
+
+    def play(self):
+        if self._playing_since is None:
+            self._playing_since = time.monotonic()
+
+    def pause(self):
+        self._advance()
+        self._playing_since = None
+
+    def _advance(self):
+        if self._playing_since is not None:
+            now = time.monotonic()
+            self._pos += int((now - self._playing_since) * self.speed * 1e9)
+            self._playing_since = now
+        events, q = self._events, self._q
+        while self._i < len(events) and events[self._i][0] <= self._pos:
+            _ts, _tid, op, n, item, _wait = events[self._i]
+            self._i += 1
+            if op == OP_PUT:
+                q.extend(range(item, item + n) if n > 1 else (item,))
+                self._appended += n
+                self.producer.count += n
+                self._max_seen = max(self._max_seen, len(q))
+            else:
+                for _ in range(min(n, len(q))):
+                    q.popleft()
+                if op == OP_GET:
+                    self.consumer.count += n
+
+    def size(self) -> int:
+        self._advance()
+        return len(self._q)
+
+    def snapshot(self) -> List[object]:
+        self._advance()
+        return list(self._q)
+
+    def tail(self, n: int) -> List[Tuple[int, object]]:
+        self._advance()
+        items = list(itertools.islice(reversed(self._q), n))
+        items.reverse()
+        return list(zip(range(self._appended - len(items), self._appended), items))
+
+    def memory_usage(self) -> int:
+        return sys.getsizeof(self._q) + sum(sys.getsizeof(it) for it in self._q)
+
+    @property
+    def max_size(self) -> int:
+        return self._max_seen
+
+
+def _summary(path: str) -> dict:
+    events, names, lost = read_trace(path)
+    per_op: Dict[str, Dict[str, int]] = {}
+    for _ts, _tid, op, n, _item, wait in events:
+        st = per_op.setdefault(OP_NAMES.get(op, str(op)), {"events": 0, "items": 0, "wait_ns": 0})
+        st["events"] += 1
+        st["items"] += n
+        st["wait_ns"] += wait
+    span = (events[-1][0] - events[0][0]) / 1e9 if events else 0.0
+    return {"events": len(events), "lost": lost, "span_s": span, "threads": names, "ops": per_op}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m utils.trace", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("summary", help="event counts and waits per operation")
+    p.add_argument("trace")
+    p = sub.add_parser("chrome", help="export as Chrome trace JSON")
+    p.add_argument("trace")
+    p.add_argument("--output", "-o", default="-", help="JSON file, '-' for stdout")
+    args = parser.parse_args(argv)
+
+    result = _summary(args.trace) if args.command == "summary" else to_chrome(args.trace)
+    text = json.dumps(result, indent=2 if args.command == "summary" else None)
+    if getattr(args, "output", "-") == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())